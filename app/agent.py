@@ -2,27 +2,43 @@ import asyncio
 import json
 import base64
 import os
-import shutil
-import httpx
 import time
 import re
-from tenacity import retry, stop_after_attempt, wait_exponential
-from playwright.async_api import async_playwright
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 
 from app.llm import ask_llm
-from app.executor import execute_generated_code
+from app.browser_pool import browser_pool
+from app.http_client import http_client
+from app.executor import execute_code_async
+from app.sandbox import SANDBOX_TIMEOUT
+from app.budget import DeadlineBudget, BudgetExhausted, GOTO_TIMEOUT, LLM_TIMEOUT, SUBMIT_TIMEOUT
 from app.scraper import SmartScraper
+from app.harvester import DownloadHarvester
+from app.profiler import build_schema_digest
+from app.datasets import TableRegistry
+from app.solvers import solve_fast_path
+from app.screenshots import screenshot_reason, capture_screenshot
+from app.prefetcher import Prefetcher, likely_next_urls
+from app.heuristics import extract_plan, reconcile_plan, HEURISTIC_MIN_CONFIDENCE
+from app.workspace import MissionWorkspace
 from app.logger import MissionLogger
+from app.metrics import span, timed
 from app.prompts import (
     PLANNER_SYSTEM_ROLE, CODER_SYSTEM_ROLE,
-    generate_planning_prompt, generate_coding_prompt, fix_json_prompt
+    compact_page_text, generate_planning_prompt, generate_coding_prompt, fix_json_prompt
 )
 
 # CONFIG: Models to use (in order of preference for retries)
 MODELS = ["openai/gpt-4.1-nano", "openai/gpt-4.1-nano", "openai/gpt-4.1-nano"]
 PLANNER_MODEL = "openai/gpt-4.1-nano"  # More reliable than Gemini for structured output
+# Used once a question's time share runs low. Off by default: the models above are already the
+# fastest reliable option, so set this only to a model that is genuinely faster for you
+FAST_MODEL = os.getenv("FAST_MODEL")
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") == "1"  # Stream and stop at the first complete answer
 
-DOWNLOAD_DIR = "downloads"
+# Speculative coding: race K candidates per attempt (1 = sequential attempts)
+SPECULATIVE_CANDIDATES = max(1, int(os.getenv("SPECULATIVE_CANDIDATES", "1")))
+SPECULATIVE_TEMPERATURES = [0.1, 0.5, 0.9]
 
 
 def clean_code_output(code: str) -> str:
@@ -54,6 +70,39 @@ def clean_code_output(code: str) -> str:
     return code
 
 
+def has_complete_code_block(text: str) -> bool:
+    """True once a fenced code block has been opened and closed"""
+    return re.search(r'```[a-zA-Z]*\s*\n.*?\n\s*```', text, re.DOTALL) is not None
+
+
+def has_complete_json_object(text: str) -> bool:
+    """True once the first top-level JSON object in the text is balanced"""
+    start = text.find('{')
+    if start == -1:
+        return False
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for ch in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return True
+    return False
+
+
 def parse_json_safely(raw_text: str) -> dict:
     """Parse JSON from LLM output, handling various formats"""
     # Clean the text
@@ -83,34 +132,180 @@ def parse_json_safely(raw_text: str) -> dict:
     return {}
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-async def safe_goto(page, url):
-    """Navigate to URL with retry logic"""
+def validate_answer(result_pkg: dict) -> tuple:
+    """
+    Check an execution result before it is submitted.
+
+    Returns:
+        (answer, None) for a usable answer, or (None, error message) otherwise
+    """
+    if not result_pkg["success"]:
+        return None, result_pkg["error"] or "Code execution failed"
+
+    answer = result_pkg["result"]
+    if answer is None:
+        return None, "Code executed but solution was None"
+
+    if isinstance(answer, dict) and "error" in answer:
+        return None, f"Solution returned error dict: {answer}"
+
+    # Unwrap nested answer
+    if isinstance(answer, dict) and "answer" in answer and len(answer) == 1:
+        answer = answer["answer"]
+        
+    if isinstance(answer, str) and "error" in answer.lower() and len(answer) < 100:
+        return None, f"Solution returned error string: {answer}"
+
+    return answer, None
+
+
+async def run_candidate(
+    index: int, plan: dict, page_data: dict, workspace: MissionWorkspace,
+    logger: MissionLogger, attempt: int, previous_error: str, server_feedback: str, budget: DeadlineBudget
+) -> dict:
+    """Generate, execute and validate one coder candidate"""
+    model = FAST_MODEL if FAST_MODEL and budget.low else MODELS[(attempt + index) % len(MODELS)]
+    temperature = SPECULATIVE_TEMPERATURES[index % len(SPECULATIVE_TEMPERATURES)]
+
+    code_prompt = generate_coding_prompt(
+        task=plan['question'],
+        files=page_data['downloaded_files'],
+        links=page_data['links'],
+        format_hint=plan.get('format_hint', 'auto'),
+        previous_error=previous_error,
+        server_feedback=server_feedback,
+        variant=index,
+        file_digest=page_data.get('file_digest', "")
+    )
+
+    with span("coder", logger, model=model, attempt=attempt + 1):
+        code_raw = await ask_llm(
+            code_prompt, 
+            system_role=CODER_SYSTEM_ROLE, 
+            model=model,
+            temperature=temperature,
+            stop_when=has_complete_code_block if LLM_STREAMING else None,
+            # Retries must not replay the cached code that just failed
+            use_cache=not (previous_error or server_feedback),
+            timeout=budget.timeout(LLM_TIMEOUT)
+        )
+    
+    # Clean and extract code
+    code = clean_code_output(code_raw)
+    
+    # Execute code off the event loop, cancelled if it would run past the deadline
+    with span("execute", logger, model=model, attempt=attempt + 1):
+        result_pkg = await execute_code_async(code, workspace, budget.timeout(SANDBOX_TIMEOUT))
+    logger.log_step(f"EXEC_{attempt+1}.{index+1}_{model}", {
+        "success": result_pkg["success"],
+        "temperature": temperature,
+        "result": str(result_pkg["result"])[:500] if result_pkg["result"] else None,
+        "error": result_pkg["error"][:500] if result_pkg["error"] else None
+    })
+
+    answer, error = validate_answer(result_pkg)
+    if error:
+        print(f"    ⚠️ Candidate {index + 1} ({model}): {error[:200]}")
+    return {"index": index, "model": model, "valid": error is None, "answer": answer, "error": error}
+
+
+async def race_candidates(
+    plan: dict, page_data: dict, workspace: MissionWorkspace, logger: MissionLogger,
+    attempt: int, budget: DeadlineBudget, previous_error: str = "", server_feedback: str = ""
+) -> dict:
+    """
+    Run SPECULATIVE_CANDIDATES coder candidates concurrently.
+
+    Candidates are executed as their code arrives; the first one that passes
+    validation wins and the others are cancelled. With one candidate this is
+    a plain sequential attempt.
+    """
+    tasks = [
+        asyncio.create_task(run_candidate(
+            index, plan, page_data, workspace, logger, attempt, previous_error, server_feedback, budget
+        ))
+        for index in range(SPECULATIVE_CANDIDATES)
+    ]
+    errors = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                candidate = await next_done
+            except Exception as e:
+                errors.append(f"Candidate crashed: {e}")
+                continue
+            if candidate["valid"]:
+                return candidate
+            errors.append(candidate["error"])
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {"index": None, "model": None, "valid": False, "answer": None, "error": errors[0] if errors else "No candidates"}
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_not_exception_type(BudgetExhausted)
+)
+async def safe_goto(page, url, budget: DeadlineBudget):
+    """Navigate to URL with retry logic (readiness is awaited by the scraper)"""
     print(f"  🌐 Navigating to: {url}")
-    await page.goto(url, timeout=45000)
+    await page.goto(url, timeout=budget.timeout(GOTO_TIMEOUT) * 1000, wait_until="domcontentloaded")
+
+
+async def await_plan(planner: asyncio.Task, guess: dict, page_text: str, page_url: str) -> dict:
+    """Planner result merged with the heuristic plan (which also fills anything the planner missed)"""
     try:
-        await page.wait_for_load_state("networkidle", timeout=10000)
-    except:
-        pass
+        planned = parse_json_safely(await planner)
+    except Exception as e:
+        print(f"  ⚠️ Planner failed: {e}")
+        planned = {}
+    return reconcile_plan(planned, guess, page_text, page_url)
+
+
+async def submit_answer(submit_url: str, payload: dict, budget: DeadlineBudget) -> dict:
+    """POST an answer and return the server's JSON verdict (raises on network/JSON errors)"""
+    print(f"    📤 Submitting to {submit_url}...")
+    timeout = budget.timeout(SUBMIT_TIMEOUT)
+    async with http_client() as client:
+        resp = await client.post(submit_url, json=payload, timeout=timeout)
+        return resp.json()
 
 
-async def process_quiz_task(email: str, secret: str, start_url: str):
-    """Main quiz processing loop"""
+async def process_quiz_task(email: str, secret: str, start_url: str, deadline: float = None):
+    """
+    Main quiz processing loop.
+
+    `deadline` is the absolute time (epoch seconds) the quiz window closes;
+    it defaults to 3 minutes from now.
+    """
+    deadline = deadline or time.time() + 180
     logger = MissionLogger(task_id=start_url)
     logger.log_step("START", {"url": start_url, "email": email})
 
-    # Clean downloads directory
-    if os.path.exists(DOWNLOAD_DIR):
-        shutil.rmtree(DOWNLOAD_DIR)
-    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True, args=["--mute-audio"])
-        context = await browser.new_context(accept_downloads=True)
+    # Private download directory, removed when the mission ends
+    try:
+        with MissionWorkspace() as workspace:
+            await _run_mission(email, secret, start_url, DeadlineBudget(deadline), logger, workspace)
+    finally:
+        # Final mission_report.json once all queued log writes are on disk
+        await asyncio.to_thread(logger.close)
+
+
+async def _run_mission(
+    email: str, secret: str, start_url: str, budget: DeadlineBudget,
+    logger: MissionLogger, workspace: MissionWorkspace
+):
+    """Solve the quiz chain inside an isolated browser context and workspace"""
+    async with browser_pool.context(accept_downloads=True) as context:
         page = await context.new_page()
         
-        scraper = SmartScraper(page)
+        scraper = SmartScraper(page, workspace)
         await scraper.setup()
+        prefetcher = Prefetcher(context, workspace)
         
         current_url = start_url
         global_start_time = time.time()
@@ -118,211 +313,234 @@ async def process_quiz_task(email: str, secret: str, start_url: str):
         
         while current_url:
             elapsed = time.time() - global_start_time
-            if elapsed > 170:  # Leave margin before 3-minute deadline
+            if budget.exhausted:
                 print(f"⏰ Time limit approaching ({elapsed:.0f}s). Stopping.")
                 break
+            # Same hard deadline, plus this question's share of the time left
+            question = budget.for_question()
 
             server_resp = {}  # Initialize to avoid unbound variable error
+            planner = None
             
             try:
                 print(f"\n{'='*60}")
                 print(f"🚀 Question #{questions_solved + 1}: {current_url}")
-                print(f"⏱️  Elapsed: {elapsed:.0f}s")
+                print(f"⏱️  Elapsed: {elapsed:.0f}s, {question.remaining():.0f}s left ({question.share_left():.0f}s for this question)")
                 print(f"{'='*60}")
                 
-                await safe_goto(page, current_url)
+                with span("prefetch_adopt", logger):
+                    adopted = await prefetcher.adopt(current_url)
+                if adopted:
+                    # Warmed in the background while the previous question was being solved
+                    await page.close()
+                    page, scraper = adopted
+                    print(f"  ⚡ Using prefetched tab: {current_url}")
+
+                # Always navigate (a prefetched page predates the previous answer and may have
+                # changed since); on an adopted tab the warm caches make this fast
+                with span("goto", logger, prefetched=bool(adopted)):
+                    await safe_goto(page, current_url, question)
                 
-                # Wait for JavaScript rendering
-                print("  ⏳ Waiting for JavaScript rendering...")
-                await asyncio.sleep(3)
+                # Wait for JavaScript rendering (DOM quiet + no requests in flight)
+                with span("ready", logger):
+                    await scraper.wait_until_ready()
                 
                 # Scroll to trigger lazy loading
                 try:
-                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await asyncio.sleep(1)
+                    with span("scroll", logger):
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        await scraper.wait_until_ready(max_wait=1.0)
                 except:
                     pass
 
-                # Click any download links to trigger downloads
-                try:
-                    download_links = await page.query_selector_all('a[href*="download"], a[download]')
-                    for link in download_links[:3]:  # Max 3 downloads
-                        try:
-                            async with page.expect_download(timeout=5000) as download_info:
-                                await link.click()
-                            download = await download_info.value
-                            path = os.path.join(DOWNLOAD_DIR, download.suggested_filename)
-                            await download.save_as(path)
-                            print(f"  📥 Downloaded: {download.suggested_filename}")
-                        except:
-                            pass
-                except:
-                    pass
+                # Fetch every linked file concurrently (cache first, browser clicks only as fallback)
+                with span("harvest", logger):
+                    await DownloadHarvester(page, workspace).harvest()
 
                 # A. OBSERVE - Get page context
-                page_data = await scraper.get_page_context()
+                with span("page_context", logger):
+                    page_data = await scraper.get_page_context()
                 print(f"  👀 Page text: {len(page_data['text'])} chars")
                 print(f"  📎 Files: {page_data['downloaded_files']}")
                 print(f"  🔗 Links: {len(page_data['links'])}")
+
+                # Fast path: recognisable tasks are answered without any LLM call
+                fast_feedback = ""
+                with span("fast_path", logger):
+                    fast = await asyncio.to_thread(solve_fast_path, page_data, workspace, current_url)
+                if fast:
+                    print(f"  ⚡ Fast path ({fast['solver']}): {str(fast['answer'])[:200]}")
+                    try:
+                        with span("submission", logger, solver=fast['solver']):
+                            server_resp = await submit_answer(fast['submit_url'], {
+                                "email": email,
+                                "secret": secret,
+                                "url": current_url,
+                                "answer": fast['answer']
+                            }, question)
+                    except Exception as e:
+                        server_resp = {"error": str(e)}
+                    logger.log_step("FAST_PATH", {**fast, "response": server_resp})
+                    print(f"    📬 Response: {server_resp}")
+                    if server_resp.get("correct") is True:
+                        print("    ✅ CORRECT!")
+                        questions_solved += 1
+                        current_url = server_resp.get("url")
+                        continue
+                    # Wrong or unreachable: solve it properly, telling the coder what was tried
+                    reason = server_resp.get('reason') or server_resp.get('error') or 'Incorrect answer'
+                    fast_feedback = f"{reason} (answer tried: {fast['answer']})"
+                    server_resp = {}
                 
-                # Take screenshot for vision models
-                screenshot_bytes = await page.screenshot(full_page=True)
-                screenshot_b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
+                # Screenshot for the vision planner, only when the extracted text looks insufficient
+                screenshot = None
+                screenshot_b64 = None
+                capture_reason = screenshot_reason(page_data)
+                if capture_reason and question.low:
+                    print(f"  ⏩ Skipping screenshot ({capture_reason}): {question.share_left():.0f}s left for this question")
+                    capture_reason = None
+                if capture_reason:
+                    with span("screenshot", logger):
+                        screenshot = await capture_screenshot(page)
+                    screenshot_b64 = base64.b64encode(screenshot).decode("utf-8")
+                    print(f"  📸 Screenshot ({capture_reason}): {len(screenshot) // 1024} KB")
                 
                 logger.log_step("OBSERVATION", {
                     "files": page_data['downloaded_files'],
                     "links_count": len(page_data['links']),
-                    "text_length": len(page_data['text'])
-                }, screenshot_b64)
+                    "text_length": len(page_data['text']),
+                    "screenshot": capture_reason
+                }, image=screenshot)
+
+                # Profile and pre-parse downloaded files in the background while the planner runs
+                profiling = asyncio.create_task(timed(
+                    asyncio.to_thread(build_schema_digest, workspace, page_data['downloaded_files']),
+                    "profile", logger
+                ))
+                preloading = asyncio.create_task(timed(
+                    asyncio.to_thread(TableRegistry(workspace).preload, page_data['downloaded_files']),
+                    "preload", logger
+                ))
 
                 # B. STRATEGIZE - Plan the approach
+                # The planner LLM runs in the background; a confident local guess lets coding start now
+                guess = extract_plan(page_data['text'], current_url)
+
+                # Deduplicated, boilerplate-free page text within the token budget, ranked by the guessed question
+                page_view, compaction = compact_page_text(page_data['text'], guess['question'] or "")
+                logger.log_step("COMPACTION", compaction)
+                if compaction['tokens_saved'] > 0:
+                    print(f"  🗜️ Page text: {compaction['tokens_before']} -> {compaction['tokens_after']} tokens "
+                          f"(saved {compaction['tokens_saved']})")
+
                 plan_prompt = generate_planning_prompt(
-                    page_data['text'], 
+                    page_view, 
                     page_data['downloaded_files'], 
                     page_data['links']
                 )
                 
-                plan_raw = await ask_llm(
+                planner_model = FAST_MODEL if FAST_MODEL and question.low else PLANNER_MODEL
+                planner = asyncio.create_task(timed(ask_llm(
                     plan_prompt, 
                     image_base64=screenshot_b64,
+                    image_mime="image/jpeg",
                     system_role=PLANNER_SYSTEM_ROLE, 
-                    model=PLANNER_MODEL
-                )
-                
-                # Parse plan
-                plan = parse_json_safely(plan_raw)
-                
-                # Validate and fill defaults
-                if not plan.get("question"):
-                    # Extract question from page text
-                    text = page_data['text'][:2000]
-                    plan["question"] = text if text else "Extract the requested information from the page"
-                
-                if not plan.get("submit_url"):
-                    # Try to find submit URL in page text
-                    submit_match = re.search(r'https?://[^\s<>"]+/submit[^\s<>"]*', page_data['text'])
-                    if submit_match:
-                        plan["submit_url"] = submit_match.group(0)
-                    else:
-                        # Look for any POST endpoint mentioned
-                        post_match = re.search(r'https?://[^\s<>"]+', page_data['text'])
-                        plan["submit_url"] = post_match.group(0) if post_match else current_url
+                    model=planner_model,
+                    stop_when=has_complete_json_object if LLM_STREAMING else None,
+                    timeout=question.timeout(LLM_TIMEOUT)
+                ), "planner", logger, model=planner_model))
+                prefetcher.start(likely_next_urls(page_data, current_url, exclude={guess['submit_url']}))
                 
-                if not plan.get("format_hint"):
-                    plan["format_hint"] = "auto"
+                if guess['confidence'] >= HEURISTIC_MIN_CONFIDENCE:
+                    plan = reconcile_plan({}, guess, page_data['text'], current_url)
+                    plan_source = "heuristic"
+                    print(f"  ⚡ Heuristic plan (confidence {guess['confidence']:.2f}), coding before the planner returns")
+                else:
+                    plan = await await_plan(planner, guess, page_data['text'], current_url)
+                    planner = None
+                    plan_source = "planner"
 
-                logger.log_step("PLANNING", plan)
+                logger.log_step("PLANNING", {**plan, "source": plan_source})
                 print(f"  📋 Task: {plan['question'][:100]}...")
                 print(f"  📤 Submit URL: {plan['submit_url']}")
                 print(f"  📝 Format: {plan.get('format_hint')}")
 
+                page_data['file_digest'] = await profiling
+                await preloading
+                if page_data['file_digest']:
+                    logger.log_step("FILE_PROFILES", {"digest": page_data['file_digest']})
+
                 # C. EXECUTE - Generate and run code
                 answer = None
                 last_error = ""
-                submission_feedback = ""
+                submission_feedback = fast_feedback
                 
                 for attempt in range(3):
-                    current_model = MODELS[attempt]
-                    print(f"\n  🔄 Attempt {attempt + 1}/3 with {current_model}")
+                    if attempt and not question.can_retry():
+                        print(f"  ⏰ {question.remaining():.0f}s left, not enough for another attempt. Stopping.")
+                        current_url = None
+                        break
+                    print(f"\n  🔄 Attempt {attempt + 1}/3 ({SPECULATIVE_CANDIDATES} candidate(s))")
                     
-                    # Generate code
-                    code_prompt = generate_coding_prompt(
-                        task=plan['question'],
-                        files=page_data['downloaded_files'],
-                        links=page_data['links'],
-                        format_hint=plan.get('format_hint', 'auto'),
+                    candidate = await race_candidates(
+                        plan, page_data, workspace, logger, attempt, question,
                         previous_error=last_error,
                         server_feedback=submission_feedback
                     )
 
-                    code_raw = await ask_llm(
-                        code_prompt, 
-                        system_role=CODER_SYSTEM_ROLE, 
-                        model=current_model
-                    )
-                    
-                    # Clean and extract code
-                    code = clean_code_output(code_raw)
+                    if planner is not None:
+                        # Reconcile the heuristic plan with the planner (normally done by now)
+                        planned = await await_plan(planner, guess, page_data['text'], current_url)
+                        planner = None
+                        if planned != plan:
+                            logger.log_step("PLAN_RECONCILED", {"heuristic": plan, "planner": planned})
+                            if planned['submit_url'] != plan['submit_url']:
+                                print(f"  🔀 Planner corrected the submit URL: {planned['submit_url']}")
+                            plan = planned
+
+                    if not candidate["valid"]:
+                        last_error = candidate["error"]
+                        continue
+
+                    answer = candidate["answer"]
+                    print(f"    💡 Answer: {str(answer)[:200]}... (candidate {candidate['index'] + 1}, {candidate['model']})")
                     
-                    # Execute code
-                    result_pkg = execute_generated_code(code)
-                    logger.log_step(f"EXEC_{attempt+1}_{current_model}", {
-                        "success": result_pkg["success"],
-                        "result": str(result_pkg["result"])[:500] if result_pkg["result"] else None,
-                        "error": result_pkg["error"][:500] if result_pkg["error"] else None
-                    })
+                    # D. SUBMIT
+                    payload = {
+                        "email": email,
+                        "secret": secret,
+                        "url": current_url,
+                        "answer": answer
+                    }
                     
-                    if result_pkg["success"]:
-                        answer = result_pkg["result"]
-                        
-                        # Validate answer
-                        if answer is None:
-                            print(f"    ⚠️ Answer is None")
-                            last_error = "Code executed but solution was None"
-                            continue
-                        
-                        if isinstance(answer, dict) and "error" in answer:
-                            print(f"    ⚠️ Answer contains error: {answer}")
-                            last_error = f"Solution returned error dict: {answer}"
-                            continue
-
-                        # Unwrap nested answer
-                        if isinstance(answer, dict) and "answer" in answer and len(answer) == 1:
-                            answer = answer["answer"]
-                            
-                        if isinstance(answer, str) and "error" in answer.lower() and len(answer) < 100:
-                            print(f"    ⚠️ Answer looks like error: {answer}")
-                            last_error = f"Solution returned error string: {answer}"
-                            continue
-
-                        print(f"    💡 Answer: {str(answer)[:200]}...")
-                        
-                        # D. SUBMIT
-                        payload = {
-                            "email": email,
-                            "secret": secret,
-                            "url": current_url,
-                            "answer": answer
-                        }
+                    try:
+                        with span("submission", logger, model=candidate['model'], attempt=attempt + 1):
+                            server_resp = await submit_answer(plan['submit_url'], payload, question)
+                    except Exception as e:
+                        print(f"    ❌ Submission error: {e}")
+                        server_resp = {"error": str(e)}
+                        last_error = f"Submission failed: {e}"
+                        continue
+
+                    logger.log_step("SUBMISSION", server_resp)
+                    print(f"    📬 Response: {server_resp}")
+
+                    if server_resp.get("correct") is True:
+                        print("    ✅ CORRECT!")
+                        questions_solved += 1
+                        current_url = server_resp.get("url")
+                        break
+                    else:
+                        reason = server_resp.get("reason", "Incorrect answer")
+                        print(f"    ❌ Wrong: {reason}")
                         
-                        print(f"    📤 Submitting to {plan['submit_url']}...")
-                        async with httpx.AsyncClient() as client:
-                            try:
-                                resp = await client.post(
-                                    plan['submit_url'], 
-                                    json=payload, 
-                                    timeout=20.0
-                                )
-                                server_resp = resp.json()
-                            except Exception as e:
-                                print(f"    ❌ Submission error: {e}")
-                                server_resp = {"error": str(e)}
-                                last_error = f"Submission failed: {e}"
-                                continue
-
-                        logger.log_step("SUBMISSION", server_resp)
-                        print(f"    📬 Response: {server_resp}")
-
-                        if server_resp.get("correct") is True:
-                            print("    ✅ CORRECT!")
-                            questions_solved += 1
+                        # Check if we should skip to next URL
+                        if server_resp.get("url"):
+                            print(f"    ⏩ Skipping to next: {server_resp['url']}")
                             current_url = server_resp.get("url")
                             break
                         else:
-                            reason = server_resp.get("reason", "Incorrect answer")
-                            print(f"    ❌ Wrong: {reason}")
-                            
-                            # Check if we should skip to next URL
-                            if server_resp.get("url"):
-                                print(f"    ⏩ Skipping to next: {server_resp['url']}")
-                                current_url = server_resp.get("url")
-                                break
-                            else:
-                                submission_feedback = reason
-                    else:
-                        error_msg = result_pkg['error'][:200] if result_pkg['error'] else "Unknown error"
-                        print(f"    ⚠️ Code error: {error_msg}")
-                        last_error = result_pkg['error'] or "Code execution failed"
+                            submission_feedback = reason
                 else:
                     # All attempts failed
                     if not server_resp.get("correct") and not server_resp.get("url"):
@@ -339,10 +557,12 @@ async def process_quiz_task(email: str, secret: str, start_url: str):
                     current_url = server_resp.get("url")
                 else:
                     current_url = None
+            finally:
+                if planner is not None and not planner.done():
+                    planner.cancel()
         
-        # Cleanup
-        await browser.close()
-        
+        await prefetcher.close()
+
         print(f"\n{'='*60}")
         print(f"🏁 Mission Complete! Solved {questions_solved} questions.")
         print(f"⏱️  Total time: {time.time() - global_start_time:.0f}s")
@@ -0,0 +1,315 @@
+import os
+import time
+import asyncio
+import shutil
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlparse
+
+from app.http_client import http_client
+from app.workspace import MissionWorkspace
+from app.kv_cache import CACHE_DIR
+
+# CONFIG: On-disk cache for downloaded quiz assets
+ASSET_CACHE_DIR = os.path.join(CACHE_DIR, "assets")
+ASSET_CACHE_MAX_MB = int(os.getenv("ASSET_CACHE_MAX_MB", "500"))
+ASSET_CACHE_FRESH_SECONDS = float(os.getenv("ASSET_CACHE_FRESH_SECONDS", "600"))  # Serve without revalidating
+MAX_DOWNLOAD_MB = int(os.getenv("MAX_DOWNLOAD_MB", "200"))  # Per-file limit, enforced while streaming
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class FetchDenied(Exception):
+    """Raised by AssetCache.fetch on 401/403: the file likely needs the browser's session"""
+
+
+def _link_or_copy(src: str, dst: str):
+    """Place `src` at `dst` as a hard link, falling back to a symlink, then a copy"""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        os.symlink(os.path.abspath(src), dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in chunks so large files never sit in memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _filename_for(url: str, headers) -> str:
+    """Content-Disposition filename, else the last URL path segment"""
+    cd = headers.get("content-disposition", "")
+    if "filename=" in cd:
+        return cd.split("filename=")[-1].split(";")[0].strip('"\' ')
+    return os.path.basename(urlparse(url).path) or "downloaded_file"
+
+
+class AssetCache:
+    """
+    Content-addressed cache for downloaded files.
+
+    Blobs are stored once per SHA-256 under `.cache/assets/blobs/` and an
+    SQLite index maps each URL to its blob plus the ETag/Last-Modified it was
+    served with. Entries younger than ASSET_CACHE_FRESH_SECONDS are served
+    without touching the network; older ones are revalidated with a
+    conditional GET. Least recently used blobs are evicted once the store
+    exceeds ASSET_CACHE_MAX_MB.
+
+    Blobs are hard-linked into workspaces, where generated code (running as
+    root, so 0o444 is no barrier) may write through the link. Each blob's
+    size and mtime are recorded when stored, and a blob that no longer
+    matches is dropped rather than served under its old SHA-256.
+    """
+
+    def __init__(self, root: str = ASSET_CACHE_DIR, max_mb: int = ASSET_CACHE_MAX_MB, fresh_seconds: float = ASSET_CACHE_FRESH_SECONDS):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self.fresh_seconds = fresh_seconds
+        self._db: sqlite3.Connection = None
+        self._lock = threading.Lock()
+        self.stats_counters = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), check_same_thread=False)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    mtime_ns INTEGER
+                );
+            """)
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(blobs)")}
+            if "mtime_ns" not in columns:
+                # Index from before integrity checks; rows without mtime_ns are treated as modified
+                self._db.execute("ALTER TABLE blobs ADD COLUMN mtime_ns INTEGER")
+                self._db.commit()
+        return self._db
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "blobs", sha256[:2], sha256)
+
+    def _drop_blob(self, sha256: str):
+        """Delete a blob and every URL pointing at it (caller holds the lock)"""
+        blob = self._blob_path(sha256)
+        if os.path.exists(blob):
+            os.chmod(blob, 0o644)
+            os.remove(blob)
+        self.db.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        self.db.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+        self.db.commit()
+
+    def _intact(self, sha256: str) -> bool:
+        """
+        True if the blob is on disk with the size and mtime recorded when it was stored.
+
+        A modified blob (written through a workspace link) is dropped.
+        """
+        try:
+            stat = os.stat(self._blob_path(sha256))
+        except OSError:
+            return False
+        with self._lock:
+            row = self.db.execute("SELECT size, mtime_ns FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            if row and (stat.st_size, stat.st_mtime_ns) == tuple(row):
+                return True
+            print(f"  ⚠️ Cached asset {sha256[:12]} was modified on disk; discarding it")
+            self._drop_blob(sha256)
+        return False
+
+    def lookup(self, url: str) -> dict:
+        """Index entry for a URL whose blob is on disk and unmodified, or None"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT sha256, filename, etag, last_modified, fetched_at FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        if not row or not self._intact(row[0]):
+            return None
+        return dict(zip(("sha256", "filename", "etag", "last_modified", "fetched_at"), row))
+
+    def is_fresh(self, entry: dict) -> bool:
+        return entry is not None and time.time() - entry["fetched_at"] < self.fresh_seconds
+
+    def materialize(self, entry: dict, workspace: MissionWorkspace, filename: str = None) -> str:
+        """Link a cached blob into the workspace and return its path (None if the blob was modified meanwhile)"""
+        if not self._intact(entry["sha256"]):
+            return None
+        path = workspace.path(filename or entry["filename"])
+        _link_or_copy(self._blob_path(entry["sha256"]), path)
+        with self._lock:
+            self.db.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), entry["sha256"]))
+            self.db.commit()
+        return path
+
+    def get_fresh(self, url: str, workspace: MissionWorkspace, filename: str = None) -> str:
+        """Link a fresh cached copy of `url` into the workspace without any network I/O"""
+        entry = self.lookup(url)
+        if not self.is_fresh(entry):
+            return None
+        path = self.materialize(entry, workspace, filename)
+        if path:
+            self.stats_counters["hits"] += 1
+        return path
+
+    def _store_blob(self, sha256: str, source_path: str):
+        blob = self._blob_path(sha256)
+        # A blob modified through a workspace link is dropped by _intact and stored again from this file
+        if not (os.path.exists(blob) and self._intact(sha256)):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            if os.path.islink(source_path):
+                shutil.copy2(source_path, blob)
+            else:
+                _link_or_copy(source_path, blob)
+            # Blobs are hard-linked into workspaces, which only ever replace files (never write
+            # in place); read-only also keeps non-root generated code from editing them
+            os.chmod(blob, 0o444)
+        with self._lock:
+            stat = os.stat(blob)
+            self.db.execute(
+                "INSERT OR REPLACE INTO blobs (sha256, size, last_access, mtime_ns) VALUES (?, ?, ?, ?)",
+                (sha256, stat.st_size, time.time(), stat.st_mtime_ns)
+            )
+            self.db.commit()
+
+    def ingest(self, url: str, path: str, etag: str = None, last_modified: str = None, sha256: str = None) -> str:
+        """
+        Record a file already downloaded into a workspace (e.g. by Playwright).
+
+        Pass `sha256` when the caller hashed the content while writing it.
+        Returns the file's SHA-256. Identical content from different URLs is stored once.
+        """
+        sha256 = sha256 or _file_sha256(path)
+        self._store_blob(sha256, path)
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO urls (url, sha256, filename, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, sha256, os.path.basename(path), etag, last_modified, time.time())
+            )
+            self.db.commit()
+        self._evict()
+        return sha256
+
+    async def fetch(self, url: str, workspace: MissionWorkspace, filename: str = None, max_bytes: int = None) -> str:
+        """
+        Get `url` into the workspace, from the cache when possible.
+
+        The body is written to disk and hashed chunk by chunk, so memory use is
+        flat whatever the file size; the download is abandoned as soon as it
+        exceeds `max_bytes` (default MAX_DOWNLOAD_MB).
+
+        Returns the local filepath or None if the download failed.
+
+        Raises:
+            FetchDenied: on 401/403 (network errors propagate as httpx exceptions)
+        """
+        cached = self.get_fresh(url, workspace, filename)
+        if cached:
+            return cached
+
+        entry = self.lookup(url)
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        max_bytes = max_bytes or MAX_DOWNLOAD_MB * 1024 * 1024
+
+        async with http_client() as client:
+            async with client.stream("GET", url, headers=headers, timeout=30.0, follow_redirects=True) as resp:
+                if resp.status_code == 304 and entry:
+                    self.stats_counters["revalidated"] += 1
+                    with self._lock:
+                        self.db.execute("UPDATE urls SET fetched_at = ? WHERE url = ?", (time.time(), url))
+                        self.db.commit()
+                    return self.materialize(entry, workspace, filename)
+
+                if resp.status_code in (401, 403):
+                    raise FetchDenied(f"HTTP {resp.status_code} for {url}")
+                if resp.status_code != 200:
+                    return None
+
+                if int(resp.headers.get("content-length") or 0) > max_bytes:
+                    print(f"  ⚠️ Skipping {url}: {resp.headers['content-length']} bytes exceeds the download limit")
+                    return None
+
+                self.stats_counters["misses"] += 1
+                filepath = workspace.path(filename or _filename_for(url, resp.headers))
+                # Never write through `filepath`: it may be a hard link to a cached blob
+                partial = workspace.temp_path(filepath)
+                received = 0
+                digest = hashlib.sha256()
+                with open(partial, "wb") as f:
+                    async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        received += len(chunk)
+                        if received > max_bytes:
+                            break
+                        f.write(chunk)
+                        digest.update(chunk)
+                if received > max_bytes:
+                    os.remove(partial)
+                    print(f"  ⚠️ Aborted {url}: exceeded the {max_bytes // (1024 * 1024)}MB download limit")
+                    return None
+                os.replace(partial, filepath)
+
+        await asyncio.to_thread(
+            self.ingest, url, filepath, resp.headers.get("etag"), resp.headers.get("last-modified"), digest.hexdigest()
+        )
+        return filepath
+
+    def _evict(self):
+        """Drop least recently used blobs until the store fits in max_bytes"""
+        with self._lock:
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for sha256, size in self.db.execute("SELECT sha256, size FROM blobs ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                blob = self._blob_path(sha256)
+                if os.path.exists(blob):
+                    os.chmod(blob, 0o644)
+                    os.remove(blob)
+                self.db.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                self.db.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+                total -= size
+                self.stats_counters["evictions"] += 1
+            self.db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        lookups = self.stats_counters["hits"] + self.stats_counters["revalidated"] + self.stats_counters["misses"]
+        return {
+            **self.stats_counters,
+            "hit_rate": round((lookups - self.stats_counters["misses"]) / lookups, 3) if lookups else 0.0,
+            "blobs": entries,
+            "bytes": total,
+        }
+
+
+asset_cache = AssetCache()
@@ -0,0 +1,154 @@
+import os
+import asyncio
+import contextlib
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+# CONFIG: Warm Chromium instances shared by every mission in this process
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_CONTEXTS = int(os.getenv("BROWSER_MAX_CONTEXTS", "50"))  # Recycle after N contexts
+BROWSER_LAUNCH_ARGS = ["--mute-audio"]
+
+
+class PooledBrowser:
+    """A launched Chromium instance plus its usage counters"""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.contexts_served = 0
+        self.active_contexts = 0
+        self.retiring = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser.is_connected() and not self.retiring
+
+
+class BrowserPool:
+    """
+    Process-wide pool of warm Chromium browsers.
+
+    Each mission gets its own isolated BrowserContext (cookies, cache and
+    downloads are not shared), while the expensive browser launch is paid
+    once at startup. Browsers are replaced when they disconnect and recycled
+    after serving `max_contexts` contexts so memory doesn't creep.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_contexts: int = BROWSER_MAX_CONTEXTS):
+        self.size = max(1, size)
+        self.max_contexts = max(1, max_contexts)
+        self._playwright = None
+        self._browsers: list[PooledBrowser] = []
+        self._lock = asyncio.Lock()
+        self._recycled = 0
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self):
+        """Launch the playwright driver and warm up `size` browsers"""
+        async with self._lock:
+            if self.started:
+                return
+            self._playwright = await async_playwright().start()
+            launched = await asyncio.gather(
+                *[self._launch() for _ in range(self.size)], return_exceptions=True
+            )
+            for slot in launched:
+                if isinstance(slot, PooledBrowser):
+                    self._browsers.append(slot)
+                else:
+                    print(f"⚠️ Browser launch failed: {slot}")
+            print(f"🌐 Browser pool ready: {len(self._browsers)}/{self.size} warm browsers")
+
+    async def stop(self):
+        """Close every browser and the playwright driver"""
+        async with self._lock:
+            for slot in self._browsers:
+                await self._close(slot)
+            self._browsers = []
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def _launch(self) -> PooledBrowser:
+        browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+        return PooledBrowser(browser)
+
+    async def _close(self, slot: PooledBrowser):
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            print(f"⚠️ Failed to close browser: {e}")
+
+    async def _acquire(self) -> PooledBrowser:
+        """Pick the least busy healthy browser, replacing dead or worn-out ones"""
+        if not self.started:
+            await self.start()
+
+        async with self._lock:
+            for slot in list(self._browsers):
+                if not slot.browser.is_connected():
+                    # Health check: crashed browsers are dropped immediately
+                    print("  ♻️ Replacing disconnected browser")
+                    self._browsers.remove(slot)
+                elif slot.retiring and slot.active_contexts == 0:
+                    self._browsers.remove(slot)
+                    await self._close(slot)
+                    self._recycled += 1
+
+            healthy = [slot for slot in self._browsers if slot.healthy]
+            while len(healthy) < self.size:
+                slot = await self._launch()
+                self._browsers.append(slot)
+                healthy.append(slot)
+
+            slot = min(healthy, key=lambda s: s.active_contexts)
+            slot.contexts_served += 1
+            slot.active_contexts += 1
+            if slot.contexts_served >= self.max_contexts:
+                # Stop handing out new contexts; closed once the last one is released
+                slot.retiring = True
+            return slot
+
+    async def _release(self, slot: PooledBrowser):
+        async with self._lock:
+            slot.active_contexts -= 1
+            if slot.retiring and slot.active_contexts == 0 and slot in self._browsers:
+                self._browsers.remove(slot)
+                await self._close(slot)
+                self._recycled += 1
+
+    @contextlib.asynccontextmanager
+    async def context(self, **context_options):
+        """
+        Borrow an isolated BrowserContext from a pooled browser.
+
+        Usage:
+            async with browser_pool.context(accept_downloads=True) as context:
+                page = await context.new_page()
+        """
+        slot = await self._acquire()
+        context: BrowserContext = None
+        try:
+            context = await slot.browser.new_context(**context_options)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            await self._release(slot)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "browsers": len(self._browsers),
+            "active_contexts": sum(s.active_contexts for s in self._browsers),
+            "contexts_served": sum(s.contexts_served for s in self._browsers),
+            "recycled": self._recycled,
+        }
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,75 @@
+import os
+import copy
+import time
+
+# CONFIG: How a mission's quiz window is spent
+BUDGET_SAFETY_MARGIN = float(os.getenv("BUDGET_SAFETY_MARGIN", "5"))  # Seconds kept free before the deadline
+BUDGET_MIN_CALL_TIMEOUT = 5.0   # Shortest timeout worth giving a call; below this the mission stops
+BUDGET_QUESTIONS_AHEAD = max(1, int(os.getenv("BUDGET_QUESTIONS_AHEAD", "2")))  # Split remaining time this many ways
+BUDGET_MIN_QUESTION_SECONDS = 30.0  # No question's share is smaller than this
+BUDGET_LOW_SECONDS = float(os.getenv("BUDGET_LOW_SECONDS", "30"))  # Share left below this -> degrade
+BUDGET_MIN_ATTEMPT_SECONDS = 15.0  # A coder call plus a run can't fit in less; no retries below this
+
+# Default (and maximum) timeouts per kind of call
+LLM_TIMEOUT = 120.0
+GOTO_TIMEOUT = 45.0
+SUBMIT_TIMEOUT = 20.0
+
+
+class BudgetExhausted(Exception):
+    """Raised when too little time is left to start a call"""
+
+
+class DeadlineBudget:
+    """
+    Time left before the quiz window closes, and how it is spent.
+
+    Every page load, LLM call, sandbox run and submission takes its timeout
+    from `timeout()`, so no single call can run past the deadline. The budget
+    returned by `for_question()` also carries that question's fair share of
+    the remaining time; once the share runs `low` the agent degrades (no
+    screenshot, fast model) rather than eating into later questions.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline - BUDGET_SAFETY_MARGIN
+        self.share_until = self.deadline
+
+    def remaining(self) -> float:
+        """Seconds until the (margin-adjusted) deadline"""
+        return max(0.0, self.deadline - time.time())
+
+    def share_left(self) -> float:
+        """Seconds left of this question's share"""
+        return max(0.0, self.share_until - time.time())
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining() < BUDGET_MIN_CALL_TIMEOUT
+
+    @property
+    def low(self) -> bool:
+        return self.share_left() < BUDGET_LOW_SECONDS
+
+    def can_retry(self) -> bool:
+        """Whether another coder attempt can still finish in time"""
+        return self.remaining() >= BUDGET_MIN_ATTEMPT_SECONDS
+
+    def timeout(self, cap: float) -> float:
+        """
+        Timeout for a call that would normally get `cap` seconds.
+
+        Raises:
+            BudgetExhausted: if less than BUDGET_MIN_CALL_TIMEOUT is left
+        """
+        remaining = self.remaining()
+        if remaining < BUDGET_MIN_CALL_TIMEOUT:
+            raise BudgetExhausted(f"Only {remaining:.1f}s left before the deadline")
+        return min(cap, remaining)
+
+    def for_question(self) -> "DeadlineBudget":
+        """Budget for the next question: the same deadline, plus its share of what is left"""
+        share = max(BUDGET_MIN_QUESTION_SECONDS, self.remaining() / BUDGET_QUESTIONS_AHEAD)
+        question = copy.copy(self)
+        question.share_until = min(self.deadline, time.time() + share)
+        return question
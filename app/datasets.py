@@ -0,0 +1,166 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+from app.workspace import MissionWorkspace
+from app.profiler import sniff_delimiter
+
+try:
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# CONFIG: Pre-parsed tables shared by every coder attempt
+TABLES_DIRNAME = ".tables"  # Inside the workspace; dotfiles are hidden from list_downloads()
+TABLE_PRELOAD_MAX_MB = int(os.getenv("TABLE_PRELOAD_MAX_MB", "500"))  # Larger files are parsed on first use
+TABLE_MEMORY_ENTRIES = int(os.getenv("TABLE_MEMORY_ENTRIES", "8"))  # Frames kept in memory per process
+TABLE_EXTENSIONS = (".csv", ".tsv", ".txt", ".json", ".xlsx", ".xls", ".parquet")
+
+# pandas >= 3 always copies on write, so shallow copies of a shared frame are safe to hand out
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+# Recently loaded frames in this process (LRU), keyed by cache file (which names the source's fingerprint)
+_loaded: OrderedDict = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def _parse(path: str, sheet) -> pd.DataFrame:
+    """Parse a source file into a DataFrame (the expensive step this module exists to do once)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".tsv", ".txt"):
+        delimiter = sniff_delimiter(path)
+        if delimiter is None:
+            raise ValueError(f"{os.path.basename(path)} is not a delimited table")
+        return pd.read_csv(path, sep=delimiter)
+    if ext in (".xlsx", ".xls"):
+        return pd.read_excel(path, sheet_name=sheet)
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            data = json.load(f)
+        return pd.json_normalize(data) if isinstance(data, (list, dict)) else pd.DataFrame([data])
+    raise ValueError(f"{os.path.basename(path)} is not a supported table format")
+
+
+class TableRegistry:
+    """
+    Tabular files of a workspace, parsed once and stored in a fast binary form.
+
+    Each table is written to `<workspace>/.tables/` as Feather (memory-mapped
+    on read, when pyarrow is installed) or as a pickle otherwise. Every later
+    load_table() call — from any sandbox worker, for any attempt or speculative
+    candidate — reads that copy instead of re-parsing the CSV/Excel/JSON.
+    """
+
+    def __init__(self, workspace: MissionWorkspace):
+        self.workspace = workspace
+        self.dir = os.path.join(workspace.dir, TABLES_DIRNAME)
+
+    def _cache_path(self, source: str, sheet) -> str:
+        """
+        Cache file for a source, named after its (inode, size, mtime).
+
+        mtimes alone can't tell files apart: asset cache hits are hard links
+        that keep the blob's old mtime, so a later question's data.csv may be
+        "older" than the table parsed from the previous one. New content always
+        arrives as a new inode (files are replaced, never rewritten).
+        """
+        stat = os.stat(source)
+        fingerprint = f"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+        suffix = "" if sheet == 0 else f"#{sheet}"
+        ext = ".feather" if PYARROW_AVAILABLE else ".pkl"
+        return os.path.join(self.dir, f"{os.path.basename(source)}{suffix}.{fingerprint}{ext}")
+
+    def _source(self, name: str) -> str:
+        """Workspace file for a table name; the extension may be omitted ("data" -> "data.csv")"""
+        path = self.workspace.resolve(name)
+        if os.path.isfile(path):
+            return path
+        for filename in self.workspace.list_files():
+            if os.path.splitext(filename)[0] == name and filename.lower().endswith(TABLE_EXTENSIONS):
+                return self.workspace.path(filename)
+        raise FileNotFoundError(f"No table named {name!r} in {self.workspace.list_files()}")
+
+    def _write(self, df: pd.DataFrame, cache_path: str):
+        os.makedirs(self.dir, exist_ok=True)
+        # Workers may build the same table concurrently; publish atomically
+        tmp = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if PYARROW_AVAILABLE:
+            try:
+                df = df.reset_index(drop=True)
+                df.columns = [str(c) for c in df.columns]
+                feather.write_feather(df, tmp, compression="uncompressed")  # Uncompressed so reads can mmap
+                os.replace(tmp, cache_path)
+                return
+            except Exception:
+                # Mixed-type object columns can't be stored in Arrow; keep them as a pickle
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                cache_path = cache_path[:-len(".feather")] + ".pkl"
+        df.to_pickle(tmp)
+        os.replace(tmp, cache_path)
+
+    def _read(self, cache_path: str) -> pd.DataFrame:
+        if cache_path.endswith(".feather"):
+            return feather.read_table(cache_path, memory_map=True).to_pandas()
+        return pd.read_pickle(cache_path)
+
+    def _find_cached(self, cache_path: str) -> str:
+        """Existing cache file for this exact source version (Feather or its pickle fallback), or None"""
+        candidates = [cache_path]
+        if cache_path.endswith(".feather"):
+            candidates.append(cache_path[:-len(".feather")] + ".pkl")
+        for candidate in candidates:
+            if os.path.exists(candidate):
+                return candidate
+        return None
+
+    def build(self, name: str, sheet=0) -> str:
+        """Parse a table into the cache if it isn't there yet; returns the cache file"""
+        source = self._source(name)
+        cache_path = self._cache_path(source, sheet)
+        cached = self._find_cached(cache_path)
+        if cached:
+            return cached
+        self._write(_parse(source, sheet), cache_path)
+        return self._find_cached(cache_path)
+
+    def load(self, name: str, sheet=0) -> pd.DataFrame:
+        cache_path = self.build(name, sheet)
+        key = cache_path
+        with _loaded_lock:
+            df = _loaded.get(key)
+            if df is not None:
+                _loaded.move_to_end(key)
+        if df is None:
+            df = self._read(cache_path)
+            with _loaded_lock:
+                _loaded[key] = df
+                while len(_loaded) > TABLE_MEMORY_ENTRIES:
+                    _loaded.popitem(last=False)
+        # Callers can modify their frame without touching the shared one
+        return df.copy(deep=not COPY_ON_WRITE)
+
+    def preload(self, files: list) -> list:
+        """
+        Parse every tabular file up front; returns the names that were cached.
+
+        Blocking; async callers should run it in a thread.
+        """
+        ready = []
+        for filename in files:
+            path = self.workspace.resolve(filename)
+            if not filename.lower().endswith(TABLE_EXTENSIONS) or not os.path.isfile(path):
+                continue
+            if os.path.getsize(path) > TABLE_PRELOAD_MAX_MB * 1024 * 1024:
+                continue
+            try:
+                self.build(filename)
+                ready.append(filename)
+            except Exception:
+                pass  # Not a table after all (prose .txt, odd JSON); generated code can still read it
+        return ready
@@ -1,8 +1,10 @@
 import sys
 import io
 import os
+import asyncio
 import base64
 import contextlib
+import threading
 import traceback
 import pandas as pd
 import numpy as np
@@ -18,13 +20,54 @@ from bs4 import BeautifulSoup
 import re
 import csv
 from app.transcriber import transcribe_audio
+from app.workspace import MissionWorkspace
+from app.datasets import TableRegistry
+from app.sandbox import sandbox_pool, SANDBOX_TIMEOUT
 
-DOWNLOAD_DIR = "downloads"
+# CONFIG: "process" runs code in the sandbox pool, "thread" in a worker thread
+EXECUTOR_BACKEND = os.getenv("EXECUTOR_BACKEND", "process")
 
 
-def execute_generated_code(code: str) -> dict:
+class _ThreadStdout:
+    """sys.stdout stand-in that sends each thread's prints to its own buffer"""
+
+    def __init__(self, real):
+        self.real = real
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, "buffer", None) or self.real
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+@contextlib.contextmanager
+def _capture_stdout(buffer: io.StringIO):
+    """Like redirect_stdout, but only for the calling thread"""
+    if not isinstance(sys.stdout, _ThreadStdout):
+        sys.stdout = _ThreadStdout(sys.stdout)
+    sys.stdout.local.buffer = buffer
+    try:
+        yield
+    finally:
+        sys.stdout.local.buffer = None
+
+
+def execute_generated_code(code: str, workspace: MissionWorkspace = None, transcribe=None) -> dict:
     """
     Execute generated Python code in a sandboxed environment.
+
+    Files are read from the mission's workspace; without one, a shared
+    `downloads/default` workspace is used. `transcribe` is a blocking
+    callable(path) -> text used by solve_audio; async callers pass one that
+    hands the work back to their event loop.
     
     Returns dict with:
         - success: bool
@@ -33,27 +76,28 @@ def execute_generated_code(code: str) -> dict:
         - stdout: captured print output
         - error: traceback if execution failed
     """
-    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    workspace = (workspace or MissionWorkspace("default")).create()
 
     def solve_audio_sync(filename):
         """Synchronous wrapper for audio transcription"""
-        import asyncio
-        filepath = os.path.join(DOWNLOAD_DIR, filename) if not filename.startswith(DOWNLOAD_DIR) else filename
+        filepath = workspace.resolve(filename)
+        if transcribe:
+            return transcribe(filepath)
         return asyncio.run(transcribe_audio(filepath))
     
     def safe_read_file(filepath):
         """Helper to read files with error handling"""
-        full_path = os.path.join(DOWNLOAD_DIR, filepath) if not filepath.startswith(DOWNLOAD_DIR) else filepath
+        full_path = workspace.resolve(filepath)
         if os.path.exists(full_path):
             with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
                 return f.read()
         return None
     
     def list_downloads():
-        """List all files in downloads directory"""
-        if os.path.exists(DOWNLOAD_DIR):
-            return os.listdir(DOWNLOAD_DIR)
-        return []
+        """List all files in the mission's download directory"""
+        return workspace.list_files()
+
+    tables = TableRegistry(workspace)
 
     # Expose tools to the LLM-generated code
     local_scope = {
@@ -80,7 +124,8 @@ def execute_generated_code(code: str) -> dict:
         "solve_audio": solve_audio_sync,
         "read_file": safe_read_file,
         "list_downloads": list_downloads,
-        "DOWNLOAD_DIR": DOWNLOAD_DIR,
+        "load_table": tables.load,
+        "DOWNLOAD_DIR": workspace.dir,
         
         # Output variable
         "solution": None
@@ -95,7 +140,7 @@ def execute_generated_code(code: str) -> dict:
 
     try:
         # Execute the code
-        with contextlib.redirect_stdout(stdout_capture):
+        with _capture_stdout(stdout_capture):
             exec(code, {"__name__": "__main__", "__builtins__": __builtins__}, local_scope)
         
         # Check if a matplotlib figure was created
@@ -148,4 +193,41 @@ def execute_generated_code(code: str) -> dict:
         }
     finally:
         # Cleanup
-        plt.close('all')
\ No newline at end of file
+        plt.close('all')
+
+
+async def execute_code_async(code: str, workspace: MissionWorkspace, timeout: float = None) -> dict:
+    """
+    Run generated code without blocking the event loop.
+
+    Uses the sandbox process pool by default (killable on timeout) and falls
+    back to a worker thread when EXECUTOR_BACKEND=thread or the pool can't
+    start. Returns the same dict as execute_generated_code.
+    """
+    timeout = timeout or SANDBOX_TIMEOUT
+    if EXECUTOR_BACKEND == "process":
+        try:
+            return await sandbox_pool.run(code, workspace, timeout)
+        except RuntimeError as e:
+            print(f"  ⚠️ Sandbox unavailable ({e}), running in a thread")
+
+    loop = asyncio.get_running_loop()
+
+    def transcribe_on_loop(filepath):
+        # Bridge back to the server's loop instead of nesting asyncio.run()
+        return asyncio.run_coroutine_threadsafe(transcribe_audio(filepath), loop).result()
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(execute_generated_code, code, workspace, transcribe_on_loop),
+            timeout
+        )
+    except asyncio.TimeoutError:
+        # Threads can't be killed: the run is abandoned and its result discarded
+        return {
+            "success": False,
+            "result": None,
+            "image": None,
+            "stdout": "",
+            "error": f"TimeoutError: code execution exceeded {timeout:.0f}s"
+        }
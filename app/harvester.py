@@ -0,0 +1,174 @@
+import os
+import asyncio
+from urllib.parse import urlparse
+from playwright.async_api import Page
+
+from app.asset_cache import asset_cache
+from app.workspace import MissionWorkspace
+
+# CONFIG: Download harvesting
+HARVEST_CONCURRENCY = int(os.getenv("HARVEST_CONCURRENCY", "8"))
+HARVEST_MAX_FILES = int(os.getenv("HARVEST_MAX_FILES", "25"))  # Safety net for link-farm pages
+CLICK_DOWNLOAD_TIMEOUT = 5000  # ms, for JS-triggered downloads
+
+DATA_EXTENSIONS = (
+    ".csv", ".tsv", ".txt", ".json", ".xml", ".xlsx", ".xls", ".parquet", ".pdf", ".zip",
+    ".mp3", ".wav", ".m4a", ".ogg", ".opus", ".flac", ".png", ".jpg", ".jpeg", ".gif",
+)
+
+# Every <a href> with what we need to classify it; `index` addresses it for click fallback
+COLLECT_LINKS_JS = """() => Array.from(document.querySelectorAll('a[href]')).map((a, index) => ({
+    index: index,
+    href: a.href,
+    download: a.hasAttribute('download')
+}))"""
+
+# Leading bytes -> extension; checked in order
+MAGIC_NUMBERS = [
+    (b"%PDF", ".pdf"),
+    (b"PK\x03\x04", ".zip"),
+    (b"\x89PNG", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF8", ".gif"),
+    (b"ID3", ".mp3"),
+    (b"\xff\xfb", ".mp3"),
+    (b"\xff\xf3", ".mp3"),
+    (b"OggS", ".ogg"),
+    (b"fLaC", ".flac"),
+    (b"PAR1", ".parquet"),
+    (b"\xd0\xcf\x11\xe0", ".xls"),
+]
+
+
+def sniff_file_type(path: str) -> str:
+    """
+    Guess a file's extension from its first bytes.
+
+    Returns an extension like ".pdf", ".html" for HTML pages, or None if unknown.
+    """
+    with open(path, "rb") as f:
+        head = f.read(512)
+    for magic, ext in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return ".wav"
+    if head[4:8] == b"ftyp":
+        return ".m4a"
+
+    text = head.lstrip().lower()
+    if text.startswith(b"<!doctype html") or b"<html" in text or b"<body" in text:
+        return ".html"
+    if text.startswith(b"<"):
+        return ".xml"
+    if text.startswith((b"{", b"[")):
+        return ".json"
+    if b"," in text or b"\t" in text:
+        return ".csv"
+    return None
+
+
+def is_download_candidate(link: dict) -> bool:
+    """Links that point at a file rather than another page"""
+    path = urlparse(link["href"]).path.lower()
+    return link["download"] or "download" in link["href"].lower() or path.endswith(DATA_EXTENSIONS)
+
+
+class DownloadHarvester:
+    """
+    Fetches every downloadable file linked from a page, concurrently.
+
+    Plain links are fetched over the shared HTTP pool through the asset
+    cache (streamed, size-limited). Only non-HTTP links and fetches that
+    failed on the network or with 401/403 fall back to clicking in the
+    browser. A link whose fetch returned an HTML page is never clicked: that
+    would navigate the quiz page away. Each file's type is sniffed: misnamed
+    files get the right extension and HTML pages are discarded.
+    """
+
+    def __init__(self, page: Page, workspace: MissionWorkspace, allow_clicks: bool = True):
+        self.page = page
+        self.workspace = workspace
+        self.allow_clicks = allow_clicks  # Off for background tabs, where a click may navigate away
+        self._semaphore = asyncio.Semaphore(HARVEST_CONCURRENCY)
+
+    async def harvest(self) -> list:
+        """Download all candidate files; returns the filenames now in the workspace"""
+        try:
+            links = await self.page.evaluate(COLLECT_LINKS_JS)
+        except Exception as e:
+            print(f"  ⚠️ Could not collect links: {e}")
+            return []
+
+        seen = set()
+        candidates = []
+        for link in links:
+            if is_download_candidate(link) and link["href"] not in seen and link["href"] != self.page.url:
+                seen.add(link["href"])
+                candidates.append(link)
+        candidates = candidates[:HARVEST_MAX_FILES]
+        if not candidates:
+            return []
+
+        http_links = [l for l in candidates if l["href"].startswith(("http://", "https://"))]
+        click_links = [l for l in candidates if l not in http_links]
+
+        results = await asyncio.gather(*[self._fetch(l) for l in http_links], return_exceptions=True)
+        saved = []
+        for link, result in zip(http_links, results):
+            if isinstance(result, str):
+                saved.append(result)
+            elif isinstance(result, Exception):
+                # Unreachable or needs cookies set by JS: let the browser try
+                click_links.append(link)
+            # None: an HTML page, a missing file or over the size limit; clicking won't help
+
+        if not self.allow_clicks:
+            click_links = []
+
+        # Clicks share the page, so they run one at a time
+        for link in click_links:
+            result = await self._click(link)
+            if result:
+                saved.append(result)
+
+        print(f"  📥 Harvested {len(saved)}/{len(candidates)} files")
+        return saved
+
+    async def _fetch(self, link: dict) -> str:
+        async with self._semaphore:
+            path = await asset_cache.fetch(link["href"], self.workspace)
+        return self._check(path)
+
+    async def _click(self, link: dict) -> str:
+        try:
+            async with self.page.expect_download(timeout=CLICK_DOWNLOAD_TIMEOUT) as download_info:
+                await self.page.locator("a[href]").nth(link["index"]).click()
+            download = await download_info.value
+            path = self.workspace.path(download.suggested_filename)
+            partial = self.workspace.temp_path(path)
+            await download.save_as(partial)
+            os.replace(partial, path)
+            # Hashing (up to MAX_DOWNLOAD_MB) and SQLite writes stay off the event loop
+            await asyncio.to_thread(asset_cache.ingest, download.url, path)
+            return self._check(path)
+        except Exception:
+            return None
+
+    def _check(self, path: str) -> str:
+        """Sniff the file type; fix the extension or drop non-files. Returns the filename or None"""
+        if not path or not os.path.exists(path):
+            return None
+        kind = sniff_file_type(path)
+        if kind == ".html":
+            os.remove(path)
+            return None
+
+        root, ext = os.path.splitext(path)
+        if kind and not ext:
+            fixed = root + kind
+            os.replace(path, fixed)
+            path = fixed
+        name = os.path.basename(path)
+        print(f"  📥 Downloaded: {name} ({os.path.getsize(path)} bytes, {kind or 'unknown type'})")
+        return name
@@ -0,0 +1,128 @@
+import os
+import re
+from urllib.parse import urljoin
+
+# CONFIG: Local plan extraction that lets coding start before the planner LLM returns
+HEURISTIC_MIN_CONFIDENCE = float(os.getenv("HEURISTIC_MIN_CONFIDENCE", "0.8"))
+
+SUBMIT_URL_PATTERN = re.compile(
+    r"(?:submit|post|send)[^\n]{0,60}?\bto\b[:\s]*[\"'`]?((?:https?://|/)[^\s<>\"'`]+)", re.IGNORECASE
+)
+SUBMIT_PATH_PATTERN = re.compile(r"https?://[^\s<>\"'`]+/submit[^\s<>\"'`]*")
+ABSOLUTE_URL_PATTERN = re.compile(r"https?://[^\s<>\"'`]+")
+QUESTION_LABEL_PATTERN = re.compile(r"^\s*(?:question|task|q\d*)\s*[:.)-]\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+TASK_VERB_PATTERN = re.compile(
+    r"\b(?:calculate|compute|find|what|how many|how much|which|determine|extract|get|count|sum|"
+    r"return|identify|transcribe|list|download|scrape)\b",
+    re.IGNORECASE
+)
+# Lines that describe the submission rather than the task
+BOILERPLATE_PATTERN = re.compile(
+    r"\b(?:submit|post|answer format|payload|json body)\b|\"(?:email|secret)\"|^\s*[{}\[\]\"]", re.IGNORECASE
+)
+
+# (pattern, format_hint); first match wins
+FORMAT_RULES = [
+    (re.compile(r"\bbase64\b|data:image", re.IGNORECASE), "base64"),
+    (re.compile(r"\"answer\"\s*:\s*-?\d", re.IGNORECASE), "number"),
+    (re.compile(r"\"answer\"\s*:\s*(?:true|false)\b", re.IGNORECASE), "boolean"),
+    (re.compile(r"\"answer\"\s*:\s*\[", re.IGNORECASE), "list"),
+    (re.compile(r"\"answer\"\s*:\s*\{", re.IGNORECASE), "dict"),
+    (re.compile(r"\"answer\"\s*:\s*\"", re.IGNORECASE), "string"),
+    (re.compile(r"\b(?:true or false|boolean|yes or no)\b", re.IGNORECASE), "boolean"),
+    (re.compile(r"\b(?:list|array)\s+of\b", re.IGNORECASE), "list"),
+    (re.compile(r"\b(?:how many|sum|total|count|average|mean|median|number|integer)\b", re.IGNORECASE), "number"),
+    (re.compile(r"\b(?:secret code|string|text|name|word)\b", re.IGNORECASE), "string"),
+]
+
+
+def find_submit_url(text: str, base_url: str) -> str:
+    """Submit endpoint named in the page text, made absolute; None if not stated"""
+    match = SUBMIT_URL_PATTERN.search(text)
+    if not match:
+        return None
+    return urljoin(base_url, match.group(1).rstrip(".,;:)"))
+
+
+def _find_question(text: str) -> tuple:
+    """(question, confidence): a labelled "Question:" line wins, else the first task-like sentence"""
+    labelled = [m.group(1).strip() for m in QUESTION_LABEL_PATTERN.finditer(text) if m.group(1).strip()]
+    if labelled:
+        # The label often introduces context; keep the lines that follow until the submit instructions
+        start = text.find(labelled[0])
+        lines = []
+        for line in text[start:].splitlines():
+            if BOILERPLATE_PATTERN.search(line):
+                break
+            if line.strip():
+                lines.append(line.strip())
+        return " ".join(lines)[:1000] or labelled[0], 0.9 if len(labelled) == 1 else 0.6
+
+    tasks = [
+        line.strip() for line in text.splitlines()
+        if TASK_VERB_PATTERN.search(line) and not BOILERPLATE_PATTERN.search(line) and len(line.strip()) > 15
+    ]
+    if not tasks:
+        return None, 0.0
+    return " ".join(tasks[:3])[:1000], 0.85 if len(tasks) == 1 else 0.5
+
+
+def _find_format(text: str) -> str:
+    for pattern, hint in FORMAT_RULES:
+        if pattern.search(text):
+            return hint
+    return "auto"
+
+
+def extract_plan(page_text: str, page_url: str) -> dict:
+    """
+    Best-effort plan (question, submit_url, format_hint) from the page text alone.
+
+    Microseconds instead of an LLM round-trip. `confidence` is the weaker of
+    the question and submit URL confidences; only plans above
+    HEURISTIC_MIN_CONFIDENCE should be acted on before the planner confirms.
+    """
+    submit_url = find_submit_url(page_text, page_url)
+    question, question_confidence = _find_question(page_text)
+    return {
+        "question": question,
+        "submit_url": submit_url,
+        "format_hint": _find_format(page_text),
+        "confidence": min(question_confidence, 0.95 if submit_url else 0.0),
+    }
+
+
+def _url_on_page(url: str, page_text: str, page_url: str) -> bool:
+    """Whether a URL is actually stated on the page (absolute or as a relative path)"""
+    if not url:
+        return False
+    if url in page_text:
+        return True
+    return any(urljoin(page_url, m.group(1)) == url for m in SUBMIT_URL_PATTERN.finditer(page_text))
+
+
+def reconcile_plan(planned: dict, guess: dict, page_text: str, page_url: str) -> dict:
+    """
+    Merge the planner's plan with the heuristic one.
+
+    The planner reads the screenshot too, so its question and format win,
+    but a submit URL it invented (not stated on the page) loses to the one
+    found in the text.
+    """
+    submit_url = planned.get("submit_url")
+    if not isinstance(submit_url, str) or not submit_url.startswith(("http://", "https://", "/")):
+        submit_url = None  # "unknown", "N/A" and the like
+    plan = {
+        "question": planned.get("question") or guess.get("question"),
+        "submit_url": urljoin(page_url, submit_url) if submit_url else None,
+        "format_hint": planned.get("format_hint") or guess.get("format_hint") or "auto",
+    }
+    if guess.get("submit_url") and not _url_on_page(plan["submit_url"], page_text, page_url):
+        plan["submit_url"] = guess["submit_url"]
+    if not plan["submit_url"]:
+        # Last resort: a /submit URL anywhere on the page, any URL, else the page itself
+        match = SUBMIT_PATH_PATTERN.search(page_text) or ABSOLUTE_URL_PATTERN.search(page_text)
+        plan["submit_url"] = match.group(0) if match else page_url
+    if not plan["question"]:
+        plan["question"] = page_text[:2000] or "Extract the requested information from the page"
+    return plan
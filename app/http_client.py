@@ -0,0 +1,63 @@
+import os
+import asyncio
+import contextlib
+import httpx
+
+# CONFIG: Shared outbound HTTP pool (LLM, Whisper, submissions, downloads)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_client: httpx.AsyncClient = None
+_client_loop: asyncio.AbstractEventLoop = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    )
+
+
+async def start_http_client():
+    """Create the process-wide client (called from the app lifespan)"""
+    global _client, _client_loop
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        _client_loop = asyncio.get_running_loop()
+        print(f"🔌 HTTP client pool ready (HTTP/2: {HTTP2_AVAILABLE})")
+
+
+async def close_http_client():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+@contextlib.asynccontextmanager
+async def http_client():
+    """
+    Borrow the shared keep-alive client.
+
+    Connections are bound to the event loop that opened them, so callers on a
+    different loop (or before the app started) get a short-lived client with
+    the same settings instead.
+    """
+    if _client is not None and not _client.is_closed and _client_loop is asyncio.get_running_loop():
+        yield _client
+    else:
+        async with _build_client() as client:
+            yield client
@@ -1,7 +1,15 @@
 import os
 import httpx
+import asyncio
 import json
+import hashlib
+import contextlib
+from collections import OrderedDict
+from typing import AsyncIterator, Callable
 from dotenv import load_dotenv
+from app.http_client import http_client
+from app.kv_cache import SqliteCache, CACHE_DIR
+from app.budget import LLM_TIMEOUT
 
 load_dotenv()
 AIPIPE_TOKEN = os.getenv("AIPIPE_TOKEN")
@@ -9,28 +17,24 @@ AIPIPE_TOKEN = os.getenv("AIPIPE_TOKEN")
 # Endpoints
 AIPIPE_URL = "https://aipipe.org/openrouter/v1/chat/completions"
 
+# CONFIG: Response cache for replayed prompts
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "100"))
 
-async def ask_llm(
-    prompt_text: str, 
-    image_base64: str = None, 
-    system_role: str = "Expert Coder", 
-    model: str = "openai/gpt-4.1-nano"
-) -> str:
-    """
-    Send a prompt to the LLM and get a response.
-    
-    Args:
-        prompt_text: The main prompt/question
-        image_base64: Optional base64 encoded image for vision models
-        system_role: The system prompt defining the AI's role
-        model: Model identifier (e.g., "openai/gpt-4.1-nano")
-    
-    Returns:
-        The LLM's response text, or an error message
-    """
-    if not AIPIPE_TOKEN:
-        return "Error: AIPIPE_TOKEN not configured in environment"
-    
+# ask_llm reports failures as text; these responses are never cached
+ERROR_PREFIXES = ("Error", "API Error", "LLM Error", "Request Error", "JSON Parse Error", "Unexpected response")
+
+
+class LLMStreamError(Exception):
+    """Raised by stream_llm when the API rejects the request or returns an error event"""
+
+
+def _build_request(
+    prompt_text: str, image_base64: str, system_role: str, model: str, temperature: float = 0.1, image_mime: str = "image/png"
+) -> tuple:
+    """Headers and chat-completions payload shared by the buffered and streaming paths"""
     headers = {
         "Authorization": f"Bearer {AIPIPE_TOKEN}",
         "Content-Type": "application/json",
@@ -44,7 +48,7 @@ async def ask_llm(
     if image_base64:
         content.append({
             "type": "image_url", 
-            "image_url": {"url": f"data:image/png;base64,{image_base64}"}
+            "image_url": {"url": f"data:{image_mime};base64,{image_base64}"}
         })
     
     payload = {
@@ -53,17 +57,265 @@ async def ask_llm(
             {"role": "system", "content": system_role},
             {"role": "user", "content": content}
         ],
-        "temperature": 0.1,
+        "temperature": temperature,
         "max_tokens": 4096
     }
+    return headers, payload
+
+
+async def stream_llm(
+    prompt_text: str, 
+    image_base64: str = None, 
+    system_role: str = "Expert Coder", 
+    model: str = "openai/gpt-4.1-nano",
+    temperature: float = 0.1,
+    image_mime: str = "image/png",
+    timeout: float = LLM_TIMEOUT
+) -> AsyncIterator[str]:
+    """
+    Stream a completion as text deltas (server-sent events).
+
+    Closing the generator early (e.g. `break` inside `async for`) closes the
+    HTTP response, so the rest of the completion is never waited for.
+
+    Raises:
+        LLMStreamError: on non-200 responses or error events
+    """
+    headers, payload = _build_request(prompt_text, image_base64, system_role, model, temperature, image_mime)
+    payload["stream"] = True
+
+    async with http_client() as client:
+        async with client.stream("POST", AIPIPE_URL, headers=headers, json=payload, timeout=timeout) as resp:
+            if resp.status_code != 200:
+                error_text = (await resp.aread()).decode("utf-8", errors="ignore")[:500]
+                raise LLMStreamError(f"API Error ({resp.status_code}): {error_text}")
+
+            async for line in resp.aiter_lines():
+                # SSE: "data: {...}" lines; ":" lines are keep-alive comments
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    event = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+
+                if "error" in event:
+                    error_msg = event["error"]
+                    if isinstance(error_msg, dict):
+                        error_msg = error_msg.get("message", str(error_msg))
+                    raise LLMStreamError(f"LLM Error: {error_msg}")
+
+                choices = event.get("choices") or []
+                if choices:
+                    delta = choices[0].get("delta", {}).get("content") or choices[0].get("text")
+                    if delta:
+                        yield delta
+
+
+async def _ask_llm_streaming(
+    prompt_text: str, 
+    image_base64: str, 
+    system_role: str, 
+    model: str, 
+    temperature: float,
+    stop_when: Callable[[str], bool],
+    image_mime: str = "image/png",
+    timeout: float = LLM_TIMEOUT
+) -> str:
+    """Accumulate a streamed completion, stopping as soon as `stop_when` is satisfied"""
+    text = ""
+    try:
+        async with contextlib.aclosing(stream_llm(prompt_text, image_base64, system_role, model, temperature, image_mime, timeout)) as chunks:
+            async for chunk in chunks:
+                text += chunk
+                if stop_when(text):
+                    print(f"  ✂️ Closing LLM stream early ({len(text)} chars)")
+                    break
+    except LLMStreamError as e:
+        print(f"  ⚠️ {e}")
+        return str(e)
+    except httpx.TimeoutException:
+        print("  ⚠️ LLM request timed out")
+        return "Error: Request timed out"
+    except Exception as e:
+        print(f"  ⚠️ LLM request failed: {e}")
+        return f"Request Error: {e}"
+
+    return text or "Unexpected response: empty stream"
+
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def _cache_key(prompt_text: str, image_base64: str, system_role: str, model: str, temperature: float, streamed: bool) -> str:
+    """Hash of the request with whitespace normalized; images are reduced to a digest"""
+    image_digest = hashlib.sha256(image_base64.encode()).hexdigest() if image_base64 else ""
+    material = json.dumps(
+        [model, _normalize(system_role), _normalize(prompt_text), image_digest, temperature, streamed]
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier response cache: an in-memory LRU in front of an SQLite store.
+
+    Only successful completions are stored, so API errors are always retried.
+    """
+
+    def __init__(self, memory_entries: int, disk: SqliteCache):
+        self.memory_entries = memory_entries
+        self.disk = disk
+        self._memory: OrderedDict = OrderedDict()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0}
+
+    def get(self, key: str) -> str:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return self._memory[key]
+        value = self.disk.get(key)
+        if value is not None:
+            self.counters["disk_hits"] += 1
+            self._remember(key, value)
+            return value
+        self.counters["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str):
+        if value.startswith(ERROR_PREFIXES):
+            return
+        self._remember(key, value)
+        self.disk.set(key, value)
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+llm_cache = LLMResponseCache(
+    memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+    disk=SqliteCache(
+        os.path.join(CACHE_DIR, "llm_responses.sqlite"),
+        ttl_seconds=LLM_CACHE_TTL,
+        max_mb=LLM_CACHE_MAX_MB
+    )
+)
+
+
+async def ask_llm(
+    prompt_text: str, 
+    image_base64: str = None, 
+    system_role: str = "Expert Coder", 
+    model: str = "openai/gpt-4.1-nano",
+    temperature: float = 0.1,
+    stop_when: Callable[[str], bool] = None,
+    use_cache: bool = True,
+    image_mime: str = "image/png",
+    timeout: float = LLM_TIMEOUT
+) -> str:
+    """
+    Send a prompt to the LLM and get a response.
+    
+    Args:
+        prompt_text: The main prompt/question
+        image_base64: Optional base64 encoded image for vision models
+        system_role: The system prompt defining the AI's role
+        model: Model identifier (e.g., "openai/gpt-4.1-nano")
+        temperature: Sampling temperature
+        stop_when: Optional predicate on the text received so far. When given,
+            the response is streamed and closed as soon as it returns True.
+        use_cache: Set False to force a fresh completion (e.g. retries after a
+            wrong answer, where replaying the cached response would not help)
+        image_mime: MIME type of the image (screenshots are sent as JPEG)
+        timeout: Upper bound in seconds for the whole call, streaming included
+            (callers pass what is left of the mission's deadline budget)
+    
+    Returns:
+        The LLM's response text, or an error message
+    """
+    if not AIPIPE_TOKEN:
+        return "Error: AIPIPE_TOKEN not configured in environment"
+
+    if not (LLM_CACHE_ENABLED and use_cache):
+        llm_cache.counters["bypassed"] += 1
+        return await _ask_llm_bounded(prompt_text, image_base64, system_role, model, temperature, stop_when, image_mime, timeout)
+
+    key = _cache_key(prompt_text, image_base64, system_role, model, temperature, stop_when is not None)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        print(f"  ♻️ LLM cache hit ({model})")
+        return cached
+
+    response = await _ask_llm_bounded(prompt_text, image_base64, system_role, model, temperature, stop_when, image_mime, timeout)
+    llm_cache.set(key, response)
+    return response
+
+
+async def _ask_llm_bounded(
+    prompt_text: str, 
+    image_base64: str, 
+    system_role: str, 
+    model: str, 
+    temperature: float,
+    stop_when: Callable[[str], bool],
+    image_mime: str,
+    timeout: float
+) -> str:
+    """
+    Call the API with a hard wall-clock bound.
+
+    httpx timeouts apply per read, so a slowly trickling stream could outlive
+    them; this cancels the call outright once `timeout` has passed.
+    """
+    try:
+        return await asyncio.wait_for(
+            _ask_llm_uncached(prompt_text, image_base64, system_role, model, temperature, stop_when, image_mime, timeout),
+            timeout
+        )
+    except asyncio.TimeoutError:
+        print(f"  ⚠️ LLM request exceeded {timeout:.0f}s")
+        return "Error: Request timed out"
+
+
+async def _ask_llm_uncached(
+    prompt_text: str, 
+    image_base64: str, 
+    system_role: str, 
+    model: str, 
+    temperature: float,
+    stop_when: Callable[[str], bool],
+    image_mime: str = "image/png",
+    timeout: float = LLM_TIMEOUT
+) -> str:
+    """Call the API, streaming when a stop predicate is given"""
+    if stop_when is not None:
+        return await _ask_llm_streaming(prompt_text, image_base64, system_role, model, temperature, stop_when, image_mime, timeout)
+    
+    headers, payload = _build_request(prompt_text, image_base64, system_role, model, temperature, image_mime)
     
-    async with httpx.AsyncClient() as client:
+    async with http_client() as client:
         try:
             resp = await client.post(
                 AIPIPE_URL, 
                 headers=headers, 
                 json=payload, 
-                timeout=120.0
+                timeout=timeout
             )
             
             if resp.status_code != 200:
@@ -1,48 +1,126 @@
 import os
 import json
 import time
+import queue
+import threading
 from datetime import datetime
 import base64
 
 LOG_DIR = "mission_logs"
 
+
+class _LogWriter:
+    """
+    Single background thread that performs all log file I/O.
+
+    Shared by every mission in the process. Appends go to kept-open file
+    handles that are flushed whenever the queue runs dry, so bursts of steps
+    cost one flush.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._files = {}
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, op: str, path: str, data=None):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="mission-log-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put((op, path, data))
+
+    def _run(self):
+        while True:
+            op, path, data = self._queue.get()
+            try:
+                if op == "append":
+                    handle = self._files.get(path)
+                    if handle is None:
+                        handle = self._files[path] = open(path, "a", encoding="utf-8")
+                    handle.write(data)
+                elif op == "write":
+                    with open(path, "wb") as f:
+                        f.write(data)
+                elif op == "close":
+                    handle = self._files.pop(path, None)
+                    if handle:
+                        handle.close()
+                elif op == "mark":
+                    data.set()
+            except Exception as e:
+                print(f"⚠️ Failed to write log file {path}: {e}")
+
+            if self._queue.empty():
+                for handle in self._files.values():
+                    handle.flush()
+
+
+_writer = _LogWriter()
+
+
 class MissionLogger:
     def __init__(self, task_id: str):
         # Create a unique folder for this specific run
         timestamp = datetime.now().strftime('%H-%M-%S')
         # Clean up the URL to make it a valid folder name
         clean_id = str(task_id).replace(":", "").replace("/", "_")[-10:]
-        
+
         self.dir = os.path.join(LOG_DIR, f"{timestamp}_{clean_id}")
         os.makedirs(self.dir, exist_ok=True)
-        
+        self.events_path = os.path.join(self.dir, "events.jsonl")
+
         self.log_data = []
+        self.closed = False
         print(f"📝 Logging mission to: {self.dir}")
 
-    def log_step(self, step_name: str, details: dict, screenshot_b64: str = None):
-        """Saves text logs and screenshot to disk"""
+    def log_step(self, step_name: str, details: dict, screenshot_b64: str = None, image: bytes = None, image_ext: str = "jpg"):
+        """
+        Record a step. Returns immediately; files are written by a background thread.
+
+        The step is appended as one line to events.jsonl. Pass raw `image`
+        bytes to skip the base64 round-trip.
+        """
         entry = {
             "timestamp": time.time(),
             "step": step_name,
             "details": details
         }
         self.log_data.append(entry)
-        
-        # Save Screenshot if provided
-        if screenshot_b64:
-            try:
-                img_path = os.path.join(self.dir, f"{step_name}.png")
-                with open(img_path, "wb") as f:
-                    f.write(base64.b64decode(screenshot_b64))
-            except Exception as e:
-                print(f"⚠️ Failed to save screenshot: {e}")
 
-        # Update the master log file immediately
+        # Serialize now: callers may keep mutating the dicts they logged
         try:
-            with open(os.path.join(self.dir, "mission_report.json"), "w") as f:
-                json.dump(self.log_data, f, indent=2, default=str)
+            _writer.submit("append", self.events_path, json.dumps(entry, default=str) + "\n")
         except Exception as e:
-            print(f"⚠️ Failed to write log JSON: {e}")
-            
+            print(f"⚠️ Failed to serialize log step: {e}")
+
+        # Save Screenshot if provided
+        if image is None and screenshot_b64:
+            image, image_ext = base64.b64decode(screenshot_b64), "png"
+        if image:
+            _writer.submit("write", os.path.join(self.dir, f"{step_name}.{image_ext}"), image)
+
     def error(self, error_msg):
-        self.log_step("ERROR", {"error": str(error_msg)})
\ No newline at end of file
+        self.log_step("ERROR", {"error": str(error_msg)})
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything logged so far is on disk"""
+        written = threading.Event()
+        _writer.submit("mark", None, written)
+        return written.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """
+        Write the complete mission_report.json and wait for all pending writes.
+
+        Blocking; async callers should run it in a thread.
+        """
+        if self.closed:
+            return True
+        self.closed = True
+        report = json.dumps(self.log_data, indent=2, default=str).encode("utf-8")
+        _writer.submit("write", os.path.join(self.dir, "mission_report.json"), report)
+        _writer.submit("close", self.events_path)
+        return self.flush(timeout)
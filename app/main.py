@@ -1,16 +1,47 @@
 import os
 import json
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 from pydantic import ValidationError
 from app.models import QuizTask
-from app.agent import process_quiz_task
+from app.browser_pool import browser_pool
+from app.http_client import start_http_client, close_http_client
+from app.sandbox import sandbox_pool
+from app.asset_cache import asset_cache
+from app.transcriber import transcription_cache
+from app.llm import llm_cache
+from app.scheduler import mission_scheduler, MissionRejected
+from app.metrics import render_prometheus
 
 load_dotenv()
 MY_SECRET = os.getenv("STUDENT_SECRET")
 
-app = FastAPI(title="LLM Quiz Solver", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up shared resources before accepting traffic"""
+    await start_http_client()
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        # Missions will retry the launch lazily
+        print(f"⚠️ Browser pool warm-up failed: {e}")
+    try:
+        await sandbox_pool.start()
+    except Exception as e:
+        print(f"⚠️ Sandbox pool warm-up failed: {e}")
+    await mission_scheduler.start()
+    yield
+    await mission_scheduler.stop()
+    await sandbox_pool.stop()
+    await browser_pool.stop()
+    await close_http_client()
+
+
+app = FastAPI(title="LLM Quiz Solver", version="1.0.0", lifespan=lifespan)
 
 
 @app.exception_handler(ValidationError)
@@ -32,13 +63,16 @@ async def json_exception_handler(request: Request, exc: json.JSONDecodeError):
 
 
 @app.post("/quiz")
-async def start_quiz(request: Request, background_tasks: BackgroundTasks):
+async def start_quiz(request: Request):
     """
     Main endpoint to receive quiz tasks.
     - Returns 400 for invalid JSON
     - Returns 403 for invalid secret
-    - Returns 200 and starts processing for valid requests
+    - Returns 503 when the mission could not start before its deadline
+    - Returns 200 and queues processing for valid requests
     """
+    received_at = time.time()
+
     # Parse JSON manually to catch errors
     try:
         body = await request.json()
@@ -57,15 +91,39 @@ async def start_quiz(request: Request, background_tasks: BackgroundTasks):
         print(f"❌ Invalid secret provided")
         raise HTTPException(status_code=403, detail="Invalid secret")
     
-    # Start background processing
-    background_tasks.add_task(process_quiz_task, task.email, task.secret, str(task.url))
-    return {"message": "Task accepted", "status": "processing"}
+    # Queue for processing (bounded concurrency, earliest deadline first)
+    try:
+        ticket = await mission_scheduler.submit(task.email, task.secret, str(task.url), received_at)
+    except MissionRejected as e:
+        print(f"🚦 Rejected request for {task.url}: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"message": "Task accepted", "status": "processing", **ticket}
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "secret_configured": bool(MY_SECRET)}
+    return {
+        "status": "healthy",
+        "secret_configured": bool(MY_SECRET),
+        "browser_pool": browser_pool.stats(),
+        "sandbox_pool": sandbox_pool.stats(),
+        "asset_cache": asset_cache.stats(),
+        "transcription_cache": transcription_cache.stats(),
+        "llm_cache": llm_cache.stats()
+    }
+
+
+@app.get("/status")
+async def scheduler_status():
+    """Queue depth and in-flight missions"""
+    return mission_scheduler.status()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency histograms in the Prometheus text format"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
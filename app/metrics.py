@@ -0,0 +1,120 @@
+import time
+import bisect
+import threading
+import contextlib
+
+# CONFIG: Latency histogram buckets (seconds), Prometheus-style upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects"""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            bucket_labels = _format_labels(key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in sorted(snapshot.items()))
+        return lines
+
+
+stage_seconds = Histogram("quiz_stage_seconds", "Wall-clock time spent in each mission stage")
+stage_errors = Counter("quiz_stage_errors_total", "Mission stages that raised an exception")
+
+
+@contextlib.contextmanager
+def span(stage: str, logger=None, **labels):
+    """
+    Time a stage (works around awaits too):
+
+        with span("planner", logger, model=PLANNER_MODEL):
+            plan_raw = await ask_llm(...)
+
+    The duration goes into the quiz_stage_seconds histogram, labelled with
+    `stage` and `labels`, and is logged as a TIMING step when a mission
+    logger is given.
+    """
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:  # Cancellation is not a failure
+        failed = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        labels = {key: str(value) for key, value in labels.items() if value is not None}
+        stage_seconds.observe(seconds, stage=stage, **labels)
+        if failed:
+            stage_errors.inc(stage=stage, **labels)
+        if logger is not None:
+            logger.log_step("TIMING", {"stage": stage, "seconds": round(seconds, 4), "failed": failed, **labels})
+
+
+async def timed(awaitable, stage: str, logger=None, **labels):
+    """Await `awaitable` inside a span, e.g. to time a background task from start to finish"""
+    with span(stage, logger, **labels):
+        return await awaitable
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    return "\n".join(stage_seconds.render() + stage_errors.render()) + "\n"
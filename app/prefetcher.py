@@ -0,0 +1,135 @@
+import os
+import re
+import asyncio
+from urllib.parse import urlparse, urljoin
+from playwright.async_api import BrowserContext
+
+from app.scraper import SmartScraper
+from app.harvester import DownloadHarvester, DATA_EXTENSIONS
+from app.workspace import MissionWorkspace
+
+# CONFIG: Background loading of likely next-question pages
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_MAX_URLS = int(os.getenv("PREFETCH_MAX_URLS", "2"))
+PREFETCH_ADOPT_WAIT = 10.0  # Seconds to wait for a still-loading prefetch before navigating normally
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"'`),]+|(?<![\w/])/[\w\-./?=&%]+")
+NEXT_URL_HINT = re.compile(r"quiz|question|next|level|stage|step|task|challenge|demo|q\d+", re.IGNORECASE)
+NOT_A_PAGE = re.compile(r"submit|logout|signout|login|\.(?:css|js|ico|svg|woff2?)(?:\?|$)", re.IGNORECASE)
+
+
+def likely_next_urls(page_data: dict, page_url: str, exclude: set = ()) -> list:
+    """
+    Same-site URLs from the page's links, text and API responses that look like quiz pages.
+
+    Ordered by how strongly they look like a next question; at most PREFETCH_MAX_URLS.
+    """
+    host = urlparse(page_url).netloc
+    current_path = urlparse(page_url).path.rstrip("/")
+    prefix = current_path.rsplit("/", 1)[0]
+
+    found = [link.get("href", "") for link in page_data.get("links", [])]
+    found += URL_PATTERN.findall(page_data.get("text", ""))
+    for call in page_data.get("api_history", []):
+        found += URL_PATTERN.findall(call.get("snippet", ""))
+
+    scored = {}
+    for raw in found:
+        url = urljoin(page_url, raw.rstrip(".,;:")).split("#")[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or parsed.netloc != host:
+            continue
+        if url == page_url or url in exclude or NOT_A_PAGE.search(url):
+            continue
+        if parsed.path.lower().endswith(DATA_EXTENSIONS):
+            continue  # Files are the harvester's job
+        score = 2 * bool(NEXT_URL_HINT.search(parsed.path)) + bool(prefix and parsed.path.startswith(prefix))
+        if score:
+            scored[url] = max(score, scored.get(url, 0))
+    return sorted(scored, key=scored.get, reverse=True)[:PREFETCH_MAX_URLS]
+
+
+class Prefetcher:
+    """
+    Loads likely next-question pages in extra tabs of the mission's browser context.
+
+    Each prefetched tab gets its own SmartScraper (so its network readiness
+    and API history are tracked from the first request) and harvests its
+    downloads into a scratch workspace, which warms the asset cache. When the
+    agent moves on to a prefetched URL it adopts the tab and navigates it
+    again: the content was loaded before the previous answer was accepted
+    and may have changed, but the warm browser and asset caches make the
+    reload fast. Every other prefetch is discarded.
+    """
+
+    def __init__(self, context: BrowserContext, workspace: MissionWorkspace):
+        self.context = context
+        self.workspace = workspace
+        # Hidden inside the mission workspace, so it is invisible to generated code and removed with it
+        self.scratch = MissionWorkspace(".prefetch", root=workspace.dir)
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def start(self, urls: list):
+        """Begin loading `urls` in the background (already-running prefetches are kept)"""
+        if not PREFETCH_ENABLED:
+            return
+        for url in urls:
+            if url not in self._tasks:
+                print(f"  🔮 Prefetching: {url}")
+                self._tasks[url] = asyncio.create_task(self._load(url))
+
+    async def _load(self, url: str) -> tuple:
+        tab = await self.context.new_page()
+        try:
+            scraper = SmartScraper(tab, self.scratch)
+            await scraper.setup()
+            response = await tab.goto(url, timeout=30000, wait_until="domcontentloaded")
+            if response and response.status >= 400:
+                # Typically a question that unlocks only after the current answer; navigate for real later
+                raise RuntimeError(f"HTTP {response.status}")
+            await scraper.wait_until_ready()
+            await DownloadHarvester(tab, self.scratch, allow_clicks=False).harvest()
+            return tab, scraper
+        except BaseException:
+            await tab.close()
+            raise
+
+    async def adopt(self, url: str) -> tuple:
+        """
+        (page, scraper) whose caches are warm for `url`, or None if it wasn't prefetched.
+
+        The page must still be navigated to `url` before use.
+
+        The adopted scraper is rebound to the mission workspace; all other
+        prefetched tabs are closed.
+        """
+        task = self._tasks.pop(url, None)
+        await self.discard()
+        if task is None:
+            return None
+        try:
+            tab, scraper = await asyncio.wait_for(task, PREFETCH_ADOPT_WAIT)
+        except Exception as e:
+            print(f"  ⚠️ Prefetch of {url} unusable: {e}")
+            return None
+
+        # Files the browser auto-downloaded on load belong to the mission
+        for filename in scraper.downloaded_files:
+            source = self.scratch.path(filename)
+            if os.path.exists(source):
+                os.replace(source, self.workspace.path(filename))
+        scraper.workspace = self.workspace
+        return tab, scraper
+
+    async def discard(self):
+        """Cancel pending prefetches and close their tabs"""
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, tuple):
+                await result[0].close()
+
+    async def close(self):
+        await self.discard()
+        self.scratch.cleanup()
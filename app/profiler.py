@@ -0,0 +1,184 @@
+import os
+import csv
+import json
+import zipfile
+import functools
+import pandas as pd
+
+from app.workspace import MissionWorkspace
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# CONFIG: File profiling for the coding prompt
+PROFILE_SAMPLE_ROWS = 3
+PROFILE_MAX_COLUMNS = 30
+PROFILE_HEAD_BYTES = 64 * 1024      # Bytes read to sniff text files and estimate row counts
+PROFILE_JSON_MAX_BYTES = 5 * 1024 * 1024  # Larger JSON files are only described, not parsed
+PROFILE_MAX_CHARS = 1500            # Per-file cap on the digest
+
+TABLE_EXTENSIONS = (".csv", ".tsv", ".txt")
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".ogg", ".opus", ".flac")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+
+
+def _describe_frame(df: pd.DataFrame) -> list:
+    columns = list(df.columns[:PROFILE_MAX_COLUMNS])
+    lines = ["  columns: " + ", ".join(f"{c} ({df[c].dtype})" for c in columns)]
+    if len(df.columns) > PROFILE_MAX_COLUMNS:
+        lines.append(f"  ... {len(df.columns) - PROFILE_MAX_COLUMNS} more columns")
+    sample = df[columns].head(PROFILE_SAMPLE_ROWS).to_string(index=False, max_colwidth=40)
+    lines.append("  sample:\n" + "\n".join("    " + row for row in sample.splitlines()))
+    return lines
+
+
+def sniff_delimiter(path: str, head: bytes = None) -> str:
+    """Delimiter of a delimited text file, or None if it doesn't look tabular"""
+    if head is None:
+        with open(path, "rb") as f:
+            head = f.read(PROFILE_HEAD_BYTES)
+    sample_lines = head.decode("utf-8", errors="replace").splitlines()[:20]
+    try:
+        return csv.Sniffer().sniff("\n".join(sample_lines), delimiters=",;\t|").delimiter
+    except csv.Error:
+        if path.endswith(".txt"):
+            return None
+        return "\t" if path.endswith(".tsv") else ","
+
+
+def _profile_text_table(path: str) -> list:
+    with open(path, "rb") as f:
+        head = f.read(PROFILE_HEAD_BYTES)
+    delimiter = sniff_delimiter(path, head)
+    if delimiter is None:
+        # Plain prose, not a table
+        snippet = " ".join(head.decode("utf-8", errors="replace").splitlines()[:20])
+        return [f"  text, starts with: {snippet[:300]!r}"]
+
+    # Row count from the average line length of the head; exact when the head is the whole file
+    size = os.path.getsize(path)
+    lines = head.count(b"\n") + (not head.endswith(b"\n"))
+    if len(head) >= size:
+        rows = f"{max(0, lines - 1)} rows"
+    else:
+        rows = f"~{int(size / len(head) * lines)} rows (estimated)"
+
+    df = pd.read_csv(path, sep=delimiter, nrows=max(PROFILE_SAMPLE_ROWS, 50), engine="python")
+    return [f"  delimiter: {delimiter!r}, {rows}", *_describe_frame(df)]
+
+
+def _profile_excel(path: str) -> list:
+    lines = []
+    with pd.ExcelFile(path) as book:
+        for sheet in book.sheet_names[:3]:
+            df = book.parse(sheet, nrows=max(PROFILE_SAMPLE_ROWS, 50))
+            try:
+                max_row = book.book[sheet].max_row - 1  # openpyxl keeps the sheet dimensions
+            except Exception:
+                max_row = None
+            lines.append(f"  sheet {sheet!r}: " + (f"{max_row} rows" if max_row is not None else "rows unknown"))
+            lines.extend("  " + line for line in _describe_frame(df))
+        if len(book.sheet_names) > 3:
+            lines.append(f"  ... {len(book.sheet_names) - 3} more sheets")
+    return lines
+
+
+def _profile_parquet(path: str) -> list:
+    if not PYARROW_AVAILABLE:
+        return _describe_frame(pd.read_parquet(path))
+    parquet = pq.ParquetFile(path)
+    df = parquet.read_row_group(0).slice(0, PROFILE_SAMPLE_ROWS).to_pandas() if parquet.num_row_groups else pd.DataFrame()
+    return [f"  {parquet.metadata.num_rows} rows", *_describe_frame(df)]
+
+
+def _profile_json(path: str) -> list:
+    if os.path.getsize(path) > PROFILE_JSON_MAX_BYTES:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return [f"  large JSON, starts with: {f.read(200)!r}"]
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        lines = [f"  list of {len(data)} items"]
+        if data and isinstance(data[0], dict):
+            lines.extend(_describe_frame(pd.DataFrame(data[:50])))
+        else:
+            lines.append(f"  first items: {json.dumps(data[:PROFILE_SAMPLE_ROWS])[:300]}")
+        return lines
+    if isinstance(data, dict):
+        return [f"  object with keys: {list(data.keys())[:PROFILE_MAX_COLUMNS]}",
+                f"  preview: {json.dumps(data)[:300]}"]
+    return [f"  value: {json.dumps(data)[:300]}"]
+
+
+def _profile_pdf(path: str) -> list:
+    import pypdf
+    reader = pypdf.PdfReader(path)
+    first_page = (reader.pages[0].extract_text() or "") if reader.pages else ""
+    snippet = " ".join(first_page.split())[:300]
+    return [f"  {len(reader.pages)} pages", f"  first page: {snippet!r}"]
+
+
+def _profile_zip(path: str) -> list:
+    with zipfile.ZipFile(path) as archive:
+        members = archive.infolist()
+    lines = [f"  {len(members)} members (extract first)"]
+    lines.extend(f"    {m.filename} ({m.file_size} bytes)" for m in members[:20])
+    return lines
+
+
+def _profile(path: str) -> list:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in TABLE_EXTENSIONS:
+        return _profile_text_table(path)
+    if ext in EXCEL_EXTENSIONS:
+        return _profile_excel(path)
+    if ext == ".parquet":
+        return _profile_parquet(path)
+    if ext == ".json":
+        return _profile_json(path)
+    if ext == ".pdf":
+        return _profile_pdf(path)
+    if ext == ".zip":
+        return _profile_zip(path)
+    if ext in AUDIO_EXTENSIONS:
+        return ["  audio: use solve_audio(filename) to transcribe"]
+    if ext in IMAGE_EXTENSIONS:
+        return ["  image"]
+    return []
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_profile(path: str, inode: int, size: int, mtime_ns: int) -> str:
+    """Profile text for one file version; inode/size/mtime make replaced files invalidate the entry"""
+    try:
+        lines = _profile(path)
+    except Exception as e:
+        lines = [f"  could not profile: {type(e).__name__}: {str(e)[:150]}"]
+    text = f"- {os.path.basename(path)} ({size} bytes)\n" + "\n".join(lines)
+    return text[:PROFILE_MAX_CHARS]
+
+
+def profile_file(path: str) -> str:
+    """Compact description of one data file: schema, row count, samples or page count"""
+    stat = os.stat(path)
+    # Cache hits are hard links keeping the blob's mtime; a replaced file is told apart by its inode
+    return _cached_profile(path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def build_schema_digest(workspace: MissionWorkspace, files: list) -> str:
+    """
+    Schema digest for every file in the workspace, for the coding prompt.
+
+    Only the head of each file is read, so this stays fast on large datasets.
+    Blocking; async callers should run it in a thread.
+    """
+    profiles = []
+    for filename in sorted(files):
+        path = workspace.resolve(filename)
+        if os.path.isfile(path):
+            profiles.append(profile_file(path))
+    return "\n".join(profiles)
@@ -1,3 +1,11 @@
+import os
+import re
+
+# CONFIG: Page text budget for the planning prompt (about what 12000 characters used to be)
+PROMPT_PAGE_TOKENS = int(os.getenv("PROMPT_PAGE_TOKENS", "3000"))
+COMPACT_CHUNK_TOKENS = 120  # Lines are ranked in chunks of about this size
+MIN_DEDUP_CHARS = 20        # Shorter lines (numbers, labels) may legitimately repeat
+
 # --- ROLE DEFINITIONS ---
 
 PLANNER_SYSTEM_ROLE = """You are a precise task analyzer for automated quiz solving.
@@ -20,22 +28,201 @@ CRITICAL RULES:
 1. Output ONLY valid Python code - no explanations, no markdown
 2. Assign your final answer to the variable `solution`
 3. NEVER use requests.post() - only calculate/extract the answer
-4. All downloaded files are in the 'downloads/' directory
+4. All downloaded files are in the directory stored in the `DOWNLOAD_DIR` variable
 5. Handle errors gracefully - don't let exceptions crash
 6. solution MUST be a value (number, string, list, dict), NOT an error message
 
 Available libraries: pandas, numpy, matplotlib, pypdf, json, os, zipfile, requests, bs4
+For tables (CSV/Excel/JSON/Parquet): load_table(filename) returns a pre-parsed DataFrame; prefer it over pd.read_*
 For audio transcription: solve_audio(filename) returns the transcription"""
 
+# Alternative approaches for speculative coder candidates (index = candidate number)
+CODING_VARIANTS = [
+    "",
+    "Approach: inspect the data first (shape, columns, first rows) and adapt to what is actually there.",
+    "Approach: prefer the simplest direct computation; avoid unnecessary parsing or network calls.",
+]
+
+# --- PROMPT COMPACTION ---
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+SECTION_PATTERN = re.compile(r"^=== .+ ===$")  # Headers added by get_page_context
+SEPARATOR_PATTERN = re.compile(r"^(?:-{3,}|[|•·»/ ]+)$")
+NAVIGATION_PATTERN = re.compile(
+    r"^(?:home|about(?: us)?|contact(?: us)?|blog|faq|help|menu|search|log ?in|log ?out|sign (?:in|up|out)|"
+    r"register|privacy(?: policy)?|terms(?: (?:of|and) [\w ]+)?|cookies?(?: policy| settings)?|accept(?: all)?(?: cookies)?|"
+    r"skip to (?:main )?content|back to top|(?:©|copyright\b).*|all rights reserved\.?)$",
+    re.IGNORECASE
+)
+KEY_LINE_PATTERN = re.compile(r"https?://|/submit|\b(?:submit|post|question|task|answer)\b|\?$", re.IGNORECASE)
+STOPWORDS = frozenset(
+    "the and for are was with from this that its your you what which how has have not but all can will into "
+    "use using each".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Local BPE-style estimate: about 6 letters or 3 digits per token, one per symbol"""
+    count = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        if piece[0].isdigit():
+            count += -(-len(piece) // 3)
+        elif piece[0].isalpha():
+            count += -(-len(piece) // 6)
+        else:
+            count += 1
+    return count
+
+
+def _keywords(text: str) -> set:
+    return {word for word in re.findall(r"[a-z0-9]{3,}", (text or "").lower()) if word not in STOPWORDS}
+
+
+def _paragraphs(page_text: str) -> list:
+    """(section header, lines) per paragraph, whitespace collapsed and navigation lines dropped"""
+    paragraphs, section, lines = [], None, []
+    for raw in page_text.splitlines():
+        line = WHITESPACE_PATTERN.sub(" ", raw).strip()
+        if not line or SEPARATOR_PATTERN.match(line) or SECTION_PATTERN.match(line):
+            if lines:
+                paragraphs.append((section, lines))
+                lines = []
+            if SECTION_PATTERN.match(line):
+                section = line
+            continue
+        if not NAVIGATION_PATTERN.match(line):
+            lines.append(line)
+    if lines:
+        paragraphs.append((section, lines))
+    return paragraphs
+
+
+def _deduplicate(paragraphs: list) -> list:
+    """
+    Drop paragraphs already contained in earlier text and long lines seen before.
+
+    innerText includes <pre>/<code> contents, so the CODE/PRE BLOCKS section
+    appended by get_page_context mostly repeats the body.
+    """
+    seen_lines = set()
+    seen_text = ""
+    kept = []
+    for section, lines in paragraphs:
+        normalized = " ".join(lines).lower()
+        if len(normalized) >= MIN_DEDUP_CHARS and normalized in seen_text:
+            continue
+        unique = []
+        for line in lines:
+            key = line.lower()
+            if len(key) >= MIN_DEDUP_CHARS:
+                if key in seen_lines:
+                    continue
+                seen_lines.add(key)
+            unique.append(line)
+        if unique:
+            kept.append((section, unique))
+            seen_text += normalized + "\n"
+    return kept
+
+
+def _chunks(paragraphs: list) -> list:
+    """Split paragraphs into (paragraph index, section, lines, tokens) of about COMPACT_CHUNK_TOKENS"""
+    max_chars = COMPACT_CHUNK_TOKENS * 4
+    chunks = []
+    for index, (section, lines) in enumerate(paragraphs):
+        chunk, size = [], 0
+        for line in lines:
+            # Minified or single-line pages: cut overlong lines into rankable pieces
+            for piece in (line[i:i + max_chars] for i in range(0, len(line), max_chars)):
+                tokens = estimate_tokens(piece)
+                if chunk and size + tokens > COMPACT_CHUNK_TOKENS:
+                    chunks.append((index, section, chunk, size))
+                    chunk, size = [], 0
+                chunk.append(piece)
+                size += tokens
+        if chunk:
+            chunks.append((index, section, chunk, size))
+    return chunks
+
+
+def _render(chunks: list, selected: set) -> str:
+    """Selected chunks in page order; section headers kept, gaps marked with [...]"""
+    parts = []
+    last_index, last_section, skipped = None, None, False
+    for position, (index, section, lines, _) in enumerate(chunks):
+        if position not in selected:
+            skipped = True
+            continue
+        if section and section != last_section:
+            parts.append(f"\n{section}")
+        elif skipped:
+            parts.append("[...]")
+        elif last_index is not None and index != last_index:
+            parts.append("")
+        parts.append("\n".join(lines))
+        last_index, last_section, skipped = index, section, False
+    if skipped:
+        parts.append("[...]")
+    return "\n".join(parts).strip()
+
+
+def compact_page_text(page_text: str, question_hint: str = "", budget_tokens: int = PROMPT_PAGE_TOKENS) -> tuple:
+    """
+    Shrink page text for the planner without cutting off the question.
+
+    Whitespace is collapsed and navigation lines and repeated blocks are
+    dropped. If the text is still over `budget_tokens`, chunks are ranked:
+    lines with URLs, submit instructions or questions come first, then
+    overlap with the `question_hint` keywords, then position on the page.
+    The best chunks that fit are kept in their original order.
+
+    Returns:
+        (compacted text, report with tokens_before, tokens_after and tokens_saved)
+    """
+    question_hint = question_hint or ""
+    tokens_before = estimate_tokens(page_text)
+    chunks = _chunks(_deduplicate(_paragraphs(page_text)))
+
+    if sum(chunk[3] for chunk in chunks) <= budget_tokens:
+        selected = set(range(len(chunks)))
+    else:
+        keywords = _keywords(question_hint)
+
+        def score(position: int) -> float:
+            text = " ".join(chunks[position][2])
+            overlap = len(_keywords(text) & keywords) / len(keywords) if keywords else 0.0
+            return 2.0 * bool(KEY_LINE_PATTERN.search(text)) + 3.0 * overlap + 1.0 / (1 + position / 10)
+
+        selected, used = set(), 0
+        for position in sorted(range(len(chunks)), key=score, reverse=True):
+            if used + chunks[position][3] <= budget_tokens:
+                selected.add(position)
+                used += chunks[position][3]
+
+    text = _render(chunks, selected)
+    tokens_after = estimate_tokens(text)
+    return text, {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+        "chunks_kept": len(selected),
+        "chunks_total": len(chunks),
+    }
+
+
 # --- DYNAMIC PROMPT GENERATORS ---
 
-def generate_planning_prompt(page_text: str, files: list, links: list) -> str:
+def generate_planning_prompt(page_text: str, files: list, links: list, question_hint: str = "") -> str:
     links_str = "\n".join([f"- {l.get('text', '')}: {l.get('href', '')}" for l in links[:15]])
+    # Callers normally pass compact_page_text() output; anything still over budget is compacted here
+    if estimate_tokens(page_text) > PROMPT_PAGE_TOKENS:
+        page_text, _ = compact_page_text(page_text, question_hint)
     
     return f"""Analyze this quiz page and extract the task details.
 
 === PAGE CONTENT ===
-{page_text[:12000]}
+{page_text}
 
 === AVAILABLE FILES ===
 {files if files else "None downloaded yet"}
@@ -65,18 +252,21 @@ def generate_coding_prompt(
     links: list, 
     format_hint: str, 
     previous_error: str = "", 
-    server_feedback: str = ""
+    server_feedback: str = "",
+    variant: int = 0,
+    file_digest: str = ""
 ) -> str:
     links_str = "\n".join([f"  - {l.get('href', '')}" for l in links[:10] if l.get('href')])
+    schema_str = f"\n=== FILE SCHEMAS (use these exact column names and delimiters) ===\n{file_digest}\n" if file_digest else ""
     
     prompt = f"""Write Python code to solve this task.
 
 === TASK ===
 {task}
 
-=== AVAILABLE FILES (in 'downloads/' directory) ===
+=== AVAILABLE FILES (in DOWNLOAD_DIR, predefined) ===
 {files if files else "No files - may need to download from links"}
-
+{schema_str}
 === AVAILABLE LINKS ===
 {links_str if links_str else "No links available"}
 
@@ -86,12 +276,12 @@ def generate_coding_prompt(
 === REQUIREMENTS ===
 1. Write complete, runnable Python code
 2. Assign the final answer to `solution` variable
-3. Files are in 'downloads/' directory (e.g., 'downloads/data.csv')
+3. Files are in DOWNLOAD_DIR (e.g., os.path.join(DOWNLOAD_DIR, 'data.csv')); DOWNLOAD_DIR is predefined
 4. Use requests.get() for URLs, NOT requests.post()
 5. Handle file not found or parsing errors gracefully
 6. For PDFs, use pypdf.PdfReader
-7. For Excel files, use pd.read_excel()
-8. For CSV, use pd.read_csv()
+7. For CSV/Excel/JSON tables, use load_table('data.csv') (already parsed; load_table('book.xlsx', sheet='Sheet2') for other sheets)
+8. Fall back to pd.read_csv()/pd.read_excel() only if load_table fails
 9. For ZIP files, extract first then process
 
 === CODE TEMPLATE ===
@@ -108,6 +298,10 @@ import zipfile
 
 solution = YOUR_ANSWER_HERE  # Must be the actual answer value"""
 
+    approach = CODING_VARIANTS[variant % len(CODING_VARIANTS)]
+    if approach:
+        prompt += f"\n\n{approach}"
+
     if previous_error:
         prompt += f"""
 
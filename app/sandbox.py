@@ -0,0 +1,228 @@
+import os
+import asyncio
+import multiprocessing as mp
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from app.workspace import MissionWorkspace
+from app.transcriber import transcribe_audio
+
+# CONFIG: Out-of-process execution of generated code
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", "2"))
+SANDBOX_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", "60"))      # Wall-clock seconds per run
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "2048"))  # RLIMIT_AS per worker
+SANDBOX_READY_TIMEOUT = 60.0  # Seconds a fresh worker may take to import its libraries
+
+# Fresh interpreters: forking a server that runs asyncio and Playwright threads is unsafe
+_mp = mp.get_context("spawn")
+
+
+def _worker_main(conn, memory_mb: int):
+    """Sandbox process: warm up imports, cap memory, then serve run requests forever"""
+    # Imports pandas, numpy, matplotlib and pypdf once for the life of the worker
+    from app.executor import execute_generated_code
+
+    if resource and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    def transcribe_via_parent(filepath):
+        # Audio is transcribed on the server's event loop (shared HTTP pool)
+        conn.send(("transcribe", filepath))
+        return conn.recv()[1]
+
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if message[0] == "stop":
+            return
+
+        _, code, workspace_dir = message
+        workspace = MissionWorkspace(os.path.basename(workspace_dir), root=os.path.dirname(workspace_dir))
+        conn.send(("result", execute_generated_code(code, workspace, transcribe_via_parent)))
+
+
+def _error_result(error: str) -> dict:
+    return {"success": False, "result": None, "image": None, "stdout": "", "error": error}
+
+
+async def _wait_readable(conn, timeout: float) -> bool:
+    """Wait until the worker has something to say, without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    fd = conn.fileno()
+    try:
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(True))
+    except NotImplementedError:
+        # Proactor loops (Windows) can't watch pipes; poll in a thread instead
+        return await loop.run_in_executor(None, conn.poll, timeout)
+    try:
+        return await asyncio.wait_for(ready, timeout)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        loop.remove_reader(fd)
+
+
+class SandboxWorker:
+    """One pre-warmed interpreter process and the parent end of its pipe"""
+
+    def __init__(self, memory_mb: int):
+        self.conn, child_conn = _mp.Pipe()
+        self.process = _mp.Process(target=_worker_main, args=(child_conn, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+
+    async def wait_ready(self) -> bool:
+        try:
+            if await _wait_readable(self.conn, SANDBOX_READY_TIMEOUT):
+                return self.conn.recv()[0] == "ready"
+        except (EOFError, OSError):
+            pass
+        return False
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pool of pre-spawned worker processes that execute generated code.
+
+    Each run gets a wall-clock timeout and every worker runs under an address
+    space cap. A worker that times out, dies or whose caller is cancelled is
+    killed and replaced in the background, so runaway code never takes the
+    server down with it.
+    """
+
+    def __init__(self, size: int = SANDBOX_WORKERS, timeout: float = SANDBOX_TIMEOUT, memory_mb: int = SANDBOX_MEMORY_MB):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._idle: asyncio.Queue = None
+        self._workers: set[SandboxWorker] = set()
+        self._respawns: set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+        self._stats = {"runs": 0, "timeouts": 0, "crashes": 0, "respawns": 0}
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self):
+        async with self._start_lock:
+            if self.started:
+                return
+            self._idle = asyncio.Queue()
+            workers = await asyncio.gather(*[self._spawn() for _ in range(self.size)])
+            for worker in workers:
+                if worker:
+                    self._idle.put_nowait(worker)
+            if self._idle.empty():
+                self._idle = None
+                raise RuntimeError("Sandbox pool could not start any worker")
+            print(f"🧪 Sandbox pool ready: {self._idle.qsize()}/{self.size} warm workers")
+
+    async def stop(self):
+        for task in self._respawns:
+            task.cancel()
+        for worker in list(self._workers):
+            worker.kill()
+        self._workers.clear()
+        self._idle = None
+
+    async def _spawn(self) -> SandboxWorker:
+        worker = SandboxWorker(self.memory_mb)
+        self._workers.add(worker)
+        if await worker.wait_ready():
+            return worker
+        print("⚠️ Sandbox worker failed to start")
+        self._discard(worker)
+        return None
+
+    def _discard(self, worker: SandboxWorker):
+        worker.kill()
+        self._workers.discard(worker)
+
+    def _replace(self, worker: SandboxWorker):
+        """Kill a worker and warm up its replacement in the background"""
+        self._discard(worker)
+        self._stats["respawns"] += 1
+
+        async def respawn():
+            replacement = await self._spawn()
+            if replacement and self._idle is not None:
+                self._idle.put_nowait(replacement)
+
+        task = asyncio.create_task(respawn())
+        self._respawns.add(task)
+        task.add_done_callback(self._respawns.discard)
+
+    async def run(self, code: str, workspace: MissionWorkspace, timeout: float = None) -> dict:
+        """
+        Execute code in a warm worker. Returns the same dict as execute_generated_code.
+        """
+        if not self.started:
+            await self.start()
+        timeout = timeout or self.timeout
+
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout)
+        except asyncio.TimeoutError:
+            return _error_result(f"TimeoutError: no sandbox worker became free within {timeout:.0f}s")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        healthy = False
+        try:
+            worker.runs += 1
+            self._stats["runs"] += 1
+            worker.conn.send(("run", code, workspace.dir))
+
+            while True:
+                if not await _wait_readable(worker.conn, deadline - loop.time()):
+                    self._stats["timeouts"] += 1
+                    print(f"    ⏱️ Sandbox run exceeded {timeout:.0f}s, killing worker")
+                    return _error_result(f"TimeoutError: code execution exceeded {timeout:.0f}s and was killed")
+
+                kind, payload = worker.conn.recv()
+                if kind == "transcribe":
+                    try:
+                        text = await asyncio.wait_for(transcribe_audio(payload), max(0.1, deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        text = "Error: transcription timed out"
+                    worker.conn.send(("transcribed", text))
+                    continue
+
+                healthy = True
+                return payload
+        except (EOFError, BrokenPipeError, OSError):
+            self._stats["crashes"] += 1
+            return _error_result(
+                f"Sandbox worker crashed; the code may have exceeded the {self.memory_mb}MB memory limit"
+            )
+        finally:
+            if healthy:
+                self._idle.put_nowait(worker)
+            else:
+                self._replace(worker)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle else 0,
+            **self._stats,
+        }
+
+
+sandbox_pool = SandboxPool()
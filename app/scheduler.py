@@ -0,0 +1,164 @@
+import os
+import time
+import uuid
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+
+from app.agent import process_quiz_task
+
+# CONFIG: Admission control for /quiz
+MAX_CONCURRENT_MISSIONS = int(os.getenv("MAX_CONCURRENT_MISSIONS", "2"))
+MAX_QUEUED_MISSIONS = int(os.getenv("MAX_QUEUED_MISSIONS", "20"))
+MISSION_WINDOW_SECONDS = 180      # Quiz deadline: 3 minutes from the original POST
+MIN_WORKING_SECONDS = float(os.getenv("MIN_WORKING_SECONDS", "60"))  # Shed if less is left at start
+INITIAL_DURATION_ESTIMATE = 90.0  # Seconds per mission until we have real measurements
+
+
+class MissionRejected(Exception):
+    """Raised when a mission cannot start in time and is refused at admission"""
+
+
+@dataclass(order=True)
+class QueuedMission:
+    deadline: float
+    seq: int
+    mission_id: str = field(compare=False)
+    email: str = field(compare=False)
+    secret: str = field(compare=False)
+    url: str = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.time)
+
+
+class MissionScheduler:
+    """
+    Bounded mission runner behind the /quiz endpoint.
+
+    Missions wait in a priority queue ordered by deadline (earliest first) and
+    at most `concurrency` run at once. A request is rejected up front when the
+    expected queue wait would leave less than MIN_WORKING_SECONDS of its
+    3-minute window, and missions that expire while queued are shed instead
+    of started.
+    """
+
+    def __init__(self, runner, concurrency: int = MAX_CONCURRENT_MISSIONS, max_queued: int = MAX_QUEUED_MISSIONS):
+        self.runner = runner
+        self.concurrency = max(1, concurrency)
+        self.max_queued = max_queued
+        self._queue: asyncio.PriorityQueue = None
+        self._workers: list[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._in_flight: dict[str, QueuedMission] = {}
+        self._started_at: dict[str, float] = {}
+        self._avg_duration = INITIAL_DURATION_ESTIMATE
+        self._counters = {"accepted": 0, "rejected": 0, "shed": 0, "completed": 0, "failed": 0}
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def estimated_wait(self) -> float:
+        """Seconds a newly submitted mission is expected to wait before starting"""
+        queued = self._queue.qsize() if self._queue else 0
+        free_slots = self.concurrency - len(self._in_flight)
+        if free_slots > queued:
+            return 0.0
+        # When each slot frees up: running missions by their expected remaining time, free
+        # slots once the queued missions that take them now have run for a full mission
+        now = time.time()
+        slots = sorted(
+            [max(0.0, self._avg_duration - (now - started)) for started in self._started_at.values()]
+            + [self._avg_duration] * free_slots
+        )
+        slots += [0.0] * (self.concurrency - len(slots))
+        # Missions queued ahead of us take the earliest slots first, in waves of `concurrency`
+        ahead = queued - free_slots
+        return slots[ahead % self.concurrency] + (ahead // self.concurrency) * self._avg_duration
+
+    async def submit(self, email: str, secret: str, url: str, received_at: float = None) -> dict:
+        """Queue a mission or raise MissionRejected"""
+        if not self._workers:
+            await self.start()
+
+        received_at = received_at or time.time()
+        deadline = received_at + MISSION_WINDOW_SECONDS
+
+        if self._queue.qsize() >= self.max_queued:
+            self._counters["rejected"] += 1
+            raise MissionRejected(f"Queue full ({self._queue.qsize()} missions waiting)")
+
+        wait = self.estimated_wait()
+        if deadline - (time.time() + wait) < MIN_WORKING_SECONDS:
+            self._counters["rejected"] += 1
+            raise MissionRejected(f"Expected queue wait of {wait:.0f}s would exceed the deadline")
+
+        mission = QueuedMission(
+            deadline=deadline,
+            seq=next(self._seq),
+            mission_id=uuid.uuid4().hex[:12],
+            email=email,
+            secret=secret,
+            url=url,
+        )
+        await self._queue.put(mission)
+        self._counters["accepted"] += 1
+        return {
+            "mission_id": mission.mission_id,
+            "queue_position": self._queue.qsize(),
+            "estimated_wait": round(wait, 1),
+        }
+
+    async def _worker(self, worker_id: int):
+        while True:
+            mission = await self._queue.get()
+            try:
+                if mission.deadline - time.time() < MIN_WORKING_SECONDS:
+                    self._counters["shed"] += 1
+                    print(f"🗑️ Shedding expired mission {mission.mission_id}: {mission.url}")
+                    continue
+
+                self._in_flight[mission.mission_id] = mission
+                self._started_at[mission.mission_id] = time.time()
+                try:
+                    await self.runner(mission.email, mission.secret, mission.url, deadline=mission.deadline)
+                    self._counters["completed"] += 1
+                except Exception as e:
+                    self._counters["failed"] += 1
+                    print(f"💥 Mission {mission.mission_id} crashed: {e}")
+                finally:
+                    duration = time.time() - self._started_at.pop(mission.mission_id)
+                    self._in_flight.pop(mission.mission_id, None)
+                    # Exponential moving average keeps admission estimates current
+                    self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            finally:
+                self._queue.task_done()
+
+    def status(self) -> dict:
+        now = time.time()
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "estimated_wait": round(self.estimated_wait(), 1),
+            "avg_mission_seconds": round(self._avg_duration, 1),
+            "in_flight": [
+                {
+                    "mission_id": m.mission_id,
+                    "url": m.url,
+                    "running_for": round(now - self._started_at[m.mission_id], 1),
+                    "deadline_in": round(m.deadline - now, 1),
+                }
+                for m in self._in_flight.values()
+            ],
+            **self._counters,
+        }
+
+
+mission_scheduler = MissionScheduler(runner=process_quiz_task)
@@ -1,31 +1,219 @@
 import os
 import re
+import time
+import asyncio
 from playwright.async_api import Page
 from urllib.parse import urljoin, urlparse
+from app.workspace import MissionWorkspace
+from app.asset_cache import asset_cache
 
-DOWNLOAD_DIR = "downloads"
+# CONFIG: Page readiness (replaces fixed sleeps after navigation)
+READY_QUIET_MS = 150         # DOM must be mutation-free this long
+READY_MIN_WAIT = 1.0         # Adaptive upper bound never goes below this...
+READY_MAX_WAIT = 8.0         # ...or above this (seconds)
+READY_INITIAL_ESTIMATE = 1.5 # Expected settle time before any page was measured
+
+# Long-lived requests that never "finish" and must not block readiness
+STREAMING_RESOURCE_TYPES = {"websocket", "eventsource", "media"}
+
+# Resolves once no DOM mutation has happened for quietMs (true) or at timeoutMs (false)
+DOM_QUIET_JS = """({quietMs, timeoutMs}) => new Promise(resolve => {
+    const start = performance.now();
+    let last = start;
+    const observer = new MutationObserver(() => { last = performance.now(); });
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    const tick = () => {
+        const now = performance.now();
+        if (now - last >= quietMs || now - start >= timeoutMs) {
+            observer.disconnect();
+            resolve(now - last >= quietMs);
+        } else {
+            setTimeout(tick, Math.min(50, quietMs));
+        }
+    };
+    setTimeout(tick, Math.min(50, quietMs));
+})"""
+
+# Caps applied inside the browser so huge pages never cross the wire in full
+EXTRACTION_LIMITS = {
+    "maxText": 60000,
+    "maxLinks": 30,
+    "maxBlocks": 50,
+    "maxBlockChars": 5000,
+    "maxTables": 10,
+    "maxRows": 20,
+    "maxForms": 5,
+    "minImagePx": 64,  # Smaller images (icons, avatars, spacers) aren't counted as content
+}
+
+# Single TreeWalker pass over the live DOM (no body clone). Script/style
+# subtrees are skipped, whitespace is collapsed outside <pre>, block elements
+# start new lines and table cells are tab-separated, approximating innerText
+# without forcing layout. Like innerText, hidden subtrees (the `hidden`
+# attribute, aria-hidden="true", display:none via checkVisibility) are left
+# out, so templates, closed modals and decoys never reach the planner.
+EXTRACT_PAGE_JS = """(limits) => {
+    const out = {text: '', links: [], code_blocks: [], tables: [], forms: [], media: {images: 0, canvases: 0}};
+    const body = document.body;
+    if (!body) return out;
+
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    const BLOCK = new Set(['P', 'DIV', 'BR', 'LI', 'TR', 'H1', 'H2', 'H3', 'H4', 'H5', 'H6',
+                           'PRE', 'SECTION', 'ARTICLE', 'HEADER', 'FOOTER', 'TABLE', 'UL', 'OL',
+                           'BLOCKQUOTE', 'FORM', 'DT', 'DD']);
+    const clip = (s, n) => (s || '').trim().substring(0, n);
+    const parts = [];
+    let textLength = 0;
+
+    const hidden = el => el.hidden || el.getAttribute('aria-hidden') === 'true'
+        || (el.checkVisibility && el.checkVisibility() === false);
+    const walker = document.createTreeWalker(body, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+        acceptNode: node => (node.nodeType === 1 && (SKIP.has(node.tagName) || hidden(node)))
+            ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT
+    });
+
+    let node;
+    while ((node = walker.nextNode())) {
+        if (node.nodeType === 3) {
+            if (textLength >= limits.maxText) continue;
+            const inPre = node.parentElement && node.parentElement.closest('pre');
+            const t = inPre ? node.nodeValue : node.nodeValue.replace(/\\s+/g, ' ');
+            if (t.trim()) {
+                parts.push(t);
+                textLength += t.length;
+            }
+            continue;
+        }
+
+        const tag = node.tagName;
+        if (BLOCK.has(tag)) parts.push('\\n');
+        else if (tag === 'TD' || tag === 'TH') parts.push('\\t');
+
+        if (tag === 'A') {
+            const href = node.href;
+            if (href && !href.startsWith('javascript:') && out.links.length < limits.maxLinks) {
+                out.links.push({text: clip(node.textContent, 100), href: href});
+            }
+        } else if (tag === 'PRE' || tag === 'CODE') {
+            // Count a <pre><code> pair once
+            const nested = node.parentElement && node.parentElement.closest('pre, code');
+            if (!nested && out.code_blocks.length < limits.maxBlocks) {
+                out.code_blocks.push(clip(node.textContent, limits.maxBlockChars));
+            }
+        } else if (tag === 'TABLE') {
+            if (out.tables.length < limits.maxTables) {
+                out.tables.push(Array.from(node.rows).slice(0, limits.maxRows)
+                    .map(row => Array.from(row.cells).map(cell => clip(cell.textContent, 200))));
+            }
+        } else if (tag === 'FORM') {
+            if (out.forms.length < limits.maxForms) {
+                out.forms.push({
+                    action: node.action || '',
+                    method: node.getAttribute('method') || 'get',
+                    fields: Array.from(node.elements).slice(0, 20).map(el => ({
+                        name: el.name || '', type: el.type || el.tagName.toLowerCase()
+                    }))
+                });
+            }
+        } else if (tag === 'IMG') {
+            // Rendered size, else intrinsic size (not yet laid out or lazy); SVGs are nearly always icons
+            const width = node.width || node.naturalWidth, height = node.height || node.naturalHeight;
+            if (Math.min(width, height) >= limits.minImagePx) out.media.images++;
+        } else if (tag === 'CANVAS') {
+            out.media.canvases++;
+        }
+    }
+
+    out.text = parts.join('').replace(/[ \\t]+\\n/g, '\\n').replace(/\\n[ \\t]+/g, '\\n')
+        .replace(/\\n{3,}/g, '\\n\\n').substring(0, limits.maxText);
+    return out;
+}"""
 
 
 class SmartScraper:
     """Intelligent web scraper with download and API call tracking"""
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, workspace: MissionWorkspace):
         self.page = page
+        self.workspace = workspace
         self.api_calls = []
         self.downloaded_files = []
+        self._in_flight = set()
+        self._network_idle = asyncio.Event()
+        self._network_idle.set()
+        self._settle_estimate = READY_INITIAL_ESTIMATE
         
     async def setup(self):
         """Initialize scraper with event handlers"""
-        os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+        self.workspace.create()
         self.page.on("download", self._handle_download)
         self.page.on("response", self._handle_response)
+        self.page.on("request", self._handle_request)
+        self.page.on("requestfinished", self._handle_request_done)
+        self.page.on("requestfailed", self._handle_request_done)
+
+    def _handle_request(self, request):
+        """Track in-flight requests for readiness detection"""
+        if request.resource_type not in STREAMING_RESOURCE_TYPES:
+            self._in_flight.add(request)
+            self._network_idle.clear()
+
+    def _handle_request_done(self, request):
+        self._in_flight.discard(request)
+        if not self._in_flight:
+            self._network_idle.set()
+
+    async def wait_until_ready(self, max_wait: float = None) -> float:
+        """
+        Wait until the DOM has stopped mutating and no requests are in flight.
+
+        The upper bound adapts to how long earlier pages took to settle
+        (clamped to READY_MIN_WAIT..READY_MAX_WAIT), so fast pages continue
+        within milliseconds and slow ones still get a fair chance.
+
+        Returns the seconds spent waiting.
+        """
+        if max_wait is None:
+            max_wait = min(READY_MAX_WAIT, max(READY_MIN_WAIT, 2.5 * self._settle_estimate))
+        start = time.time()
+        deadline = start + max_wait
+        settled = False
+
+        while time.time() < deadline:
+            remaining = deadline - time.time()
+            try:
+                await asyncio.wait_for(self._network_idle.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+            try:
+                dom_quiet = await self.page.evaluate(
+                    DOM_QUIET_JS,
+                    {"quietMs": READY_QUIET_MS, "timeoutMs": max(0, (deadline - time.time()) * 1000)}
+                )
+            except Exception:
+                # Navigation replaced the document mid-check; look again
+                await asyncio.sleep(0.05)
+                continue
+            if dom_quiet and not self._in_flight:
+                settled = True
+                break
+
+        waited = time.time() - start
+        if settled:
+            self._settle_estimate = 0.7 * self._settle_estimate + 0.3 * waited
+        print(f"  ⏳ Page {'ready' if settled else 'still busy'} after {waited:.2f}s (bound {max_wait:.1f}s)")
+        return waited
 
     async def _handle_download(self, download):
         """Handle file downloads"""
         try:
             filename = download.suggested_filename
-            path = os.path.join(DOWNLOAD_DIR, filename)
-            await download.save_as(path)
+            path = self.workspace.path(filename)
+            # Replace rather than overwrite: `path` may be a hard link to a cached blob
+            partial = self.workspace.temp_path(path)
+            await download.save_as(partial)
+            os.replace(partial, path)
+            await asyncio.to_thread(asset_cache.ingest, download.url, path)
             if filename not in self.downloaded_files:
                 self.downloaded_files.append(filename)
             print(f"  📥 Auto-downloaded: {filename}")
@@ -63,57 +251,41 @@ class SmartScraper:
         Returns dict with:
             - text: visible page text
             - links: list of links with text and href
+            - tables: first rows of each table as lists of cell strings
+            - forms: action, method and field names of each form
+            - media: counts of content images (icons excluded) and canvases (used to decide on screenshots)
             - api_history: recent API calls detected
             - downloaded_files: files that were downloaded
         """
-        # Extract all links
-        links = await self.page.evaluate("""() => {
-            const links = Array.from(document.querySelectorAll('a[href]'));
-            return links.map(a => ({
-                text: (a.innerText || a.textContent || '').trim().substring(0, 100),
-                href: a.href
-            })).filter(l => l.href && !l.href.startsWith('javascript:'));
-        }""")
-        
-        # Extract page text
+        # One round-trip: text, links, code blocks, tables and forms, capped in the browser
         try:
-            text = await self.page.evaluate("""() => {
-                // Get text content, preserving some structure
-                const body = document.body;
-                if (!body) return '';
-                
-                // Remove script and style elements from consideration
-                const clone = body.cloneNode(true);
-                const scripts = clone.querySelectorAll('script, style, noscript');
-                scripts.forEach(s => s.remove());
-                
-                return clone.innerText || clone.textContent || '';
-            }""")
-        except:
-            text = ""
-        
-        # Extract any visible code blocks or pre-formatted text
-        try:
-            code_blocks = await self.page.evaluate("""() => {
-                const blocks = document.querySelectorAll('pre, code');
-                return Array.from(blocks).map(b => b.textContent).join('\\n---\\n');
-            }""")
-            if code_blocks:
-                text += "\n\n=== CODE/PRE BLOCKS ===\n" + code_blocks
-        except:
-            pass
+            extracted = await self.page.evaluate(EXTRACT_PAGE_JS, EXTRACTION_LIMITS)
+        except Exception as e:
+            print(f"  ⚠️ Page extraction failed: {e}")
+            extracted = {"text": "", "links": [], "code_blocks": [], "tables": [], "forms": [], "media": {}}
+
+        text = extracted["text"]
+        if extracted["code_blocks"]:
+            text += "\n\n=== CODE/PRE BLOCKS ===\n" + "\n---\n".join(extracted["code_blocks"])
+        if extracted["forms"]:
+            form_lines = [
+                f"- {f['method'].upper()} {f['action']} fields: {', '.join(x['name'] or x['type'] for x in f['fields'])}"
+                for f in extracted["forms"]
+            ]
+            text += "\n\n=== FORMS ===\n" + "\n".join(form_lines)
         
         # Get list of actually downloaded files
-        actual_files = []
-        if os.path.exists(DOWNLOAD_DIR):
-            actual_files = os.listdir(DOWNLOAD_DIR)
+        actual_files = self.workspace.list_files()
         
         # Merge tracked downloads with actual files
         all_files = list(set(self.downloaded_files + actual_files))
 
         return {
             "text": text.strip(),
-            "links": links[:30],  # Limit to 30 most relevant links
+            "links": extracted["links"],  # Capped at 30 in the browser
+            "tables": extracted["tables"],
+            "forms": extracted["forms"],
+            "media": extracted["media"],
             "api_history": self.api_calls[-10:],  # Last 10 API calls
             "downloaded_files": all_files
         }
@@ -125,30 +297,13 @@ class SmartScraper:
         Returns the local filepath or None if failed.
         """
         try:
-            import httpx
-            
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                resp = await client.get(url, timeout=30.0)
-                
-                if resp.status_code == 200:
-                    # Determine filename
-                    if not filename:
-                        # Try to get from Content-Disposition header
-                        cd = resp.headers.get("content-disposition", "")
-                        if "filename=" in cd:
-                            filename = cd.split("filename=")[-1].strip('"\'')
-                        else:
-                            # Use URL path
-                            filename = os.path.basename(urlparse(url).path) or "downloaded_file"
-                    
-                    filepath = os.path.join(DOWNLOAD_DIR, filename)
-                    with open(filepath, "wb") as f:
-                        f.write(resp.content)
-                    
-                    if filename not in self.downloaded_files:
-                        self.downloaded_files.append(filename)
-                    
-                    return filepath
+            # Served from the asset cache when this URL was fetched before
+            filepath = await asset_cache.fetch(url, self.workspace, filename)
+            if filepath:
+                filename = os.path.basename(filepath)
+                if filename not in self.downloaded_files:
+                    self.downloaded_files.append(filename)
+                return filepath
         except Exception as e:
             print(f"  ⚠️ Failed to download {url}: {e}")
         
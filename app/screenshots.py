@@ -0,0 +1,98 @@
+import io
+import os
+from playwright.async_api import Page
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:  # Pillow normally comes with matplotlib
+    PIL_AVAILABLE = False
+
+# CONFIG: Screenshots for the vision planner, taken only when the text isn't enough
+SCREENSHOT_MODE = os.getenv("SCREENSHOT_MODE", "auto")  # auto | always | never
+SCREENSHOT_MIN_TEXT = int(os.getenv("SCREENSHOT_MIN_TEXT", "200"))     # Less text than this -> capture
+SCREENSHOT_MAX_BYTES = int(os.getenv("SCREENSHOT_MAX_BYTES", "200000"))  # Target size of the encoded JPEG
+SCREENSHOT_MAX_WIDTH = 1600   # CSS pixels; content beyond these is cut off
+SCREENSHOT_MAX_HEIGHT = 3000
+JPEG_QUALITIES = (75, 55, 35)
+
+# Bounding box of everything visible that has text or is media, in page coordinates
+CONTENT_BOX_JS = """() => {
+    let top = Infinity, left = Infinity, bottom = 0, right = 0;
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT);
+    for (let node = walker.currentNode; node; node = walker.nextNode()) {
+        const tag = node.tagName.toUpperCase();
+        const media = tag === 'IMG' || tag === 'CANVAS' || tag === 'SVG' || tag === 'VIDEO';
+        const ownText = Array.from(node.childNodes).some(c => c.nodeType === 3 && c.textContent.trim());
+        if (!media && !ownText) continue;
+        const r = node.getBoundingClientRect();
+        if (r.width < 1 || r.height < 1) continue;
+        top = Math.min(top, r.top + scrollY); left = Math.min(left, r.left + scrollX);
+        bottom = Math.max(bottom, r.bottom + scrollY); right = Math.max(right, r.right + scrollX);
+    }
+    if (top === Infinity) return null;
+    return {x: Math.max(0, left - 8), y: Math.max(0, top - 8), width: right - left + 16, height: bottom - top + 16};
+}"""
+
+
+def screenshot_reason(page_data: dict) -> str:
+    """Why the planner needs to see the page, or None when the extracted text is enough"""
+    if SCREENSHOT_MODE == "never":
+        return None
+    if SCREENSHOT_MODE == "always":
+        return "always"
+    media = page_data.get("media") or {}
+    if media.get("canvases"):
+        return "canvas"
+    if media.get("images"):
+        # Content images (icons excluded by the scraper), e.g. "what number is shown in the chart below?"
+        return "images"
+    if len(page_data.get("text", "")) < SCREENSHOT_MIN_TEXT:
+        return "little text"
+    return None
+
+
+def _shrink(jpeg: bytes, budget: int) -> bytes:
+    """Downscale a JPEG until it fits the byte budget"""
+    image = Image.open(io.BytesIO(jpeg))
+    while len(jpeg) > budget and min(image.size) > 200:
+        scale = max(0.5, (budget / len(jpeg)) ** 0.5)
+        image = image.resize((int(image.width * scale), int(image.height * scale)))
+        out = io.BytesIO()
+        image.convert("RGB").save(out, format="JPEG", quality=JPEG_QUALITIES[-1])
+        jpeg = out.getvalue()
+    return jpeg
+
+
+async def capture_screenshot(page: Page, max_bytes: int = SCREENSHOT_MAX_BYTES) -> bytes:
+    """
+    JPEG of the page's content region, within `max_bytes` where possible.
+
+    Blank margins are cropped, oversized pages are cut at SCREENSHOT_MAX_WIDTH
+    x SCREENSHOT_MAX_HEIGHT and pixels are captured at CSS scale (not device
+    scale). Quality is stepped down until the image fits; if it still doesn't,
+    it is downscaled.
+    """
+    try:
+        box = await page.evaluate(CONTENT_BOX_JS)
+    except Exception:
+        box = None
+
+    # Without a content box (empty body), fall back to the viewport rather than the whole page
+    options = {"type": "jpeg", "scale": "css", "full_page": bool(box)}
+    if box:
+        options["clip"] = {
+            "x": box["x"],
+            "y": box["y"],
+            "width": min(box["width"], SCREENSHOT_MAX_WIDTH),
+            "height": min(box["height"], SCREENSHOT_MAX_HEIGHT),
+        }
+
+    jpeg = b""
+    for quality in JPEG_QUALITIES:
+        jpeg = await page.screenshot(quality=quality, **options)
+        if len(jpeg) <= max_bytes:
+            return jpeg
+    if PIL_AVAILABLE:
+        jpeg = _shrink(jpeg, max_bytes)
+    return jpeg
@@ -0,0 +1,155 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+from app.workspace import MissionWorkspace
+from app.datasets import TableRegistry, TABLE_EXTENSIONS
+from app.heuristics import find_submit_url
+
+# CONFIG: Deterministic fast path that answers recognisable tasks without the LLM
+FASTPATH_ENABLED = os.getenv("FASTPATH_ENABLED", "1") == "1"
+FASTPATH_MIN_CONFIDENCE = float(os.getenv("FASTPATH_MIN_CONFIDENCE", "0.9"))
+
+AGGREGATIONS = {
+    "sum": "sum", "total": "sum",
+    "average": "mean", "mean": "mean", "avg": "mean",
+    "median": "median",
+    "maximum": "max", "max": "max", "largest": "max", "highest": "max",
+    "minimum": "min", "min": "min", "smallest": "min", "lowest": "min",
+    "count": "count", "number": "count",
+}
+AGGREGATE_PATTERN = re.compile(
+    r"\b(" + "|".join(AGGREGATIONS) + r")\b\s+(?:value\s+)?of\s+(?:the\s+|all\s+)?(?:values\s+in\s+(?:the\s+)?)?"
+    r"(?:[\"'`]([^\"'`\n]{1,60})[\"'`]\s+column|column\s+[\"'`]?([\w .-]{1,60}?)[\"'`]?(?=[\s.,;?]|$))",
+    re.IGNORECASE
+)
+# Anything that narrows or reshapes the aggregate means the template no longer applies
+QUALIFIER_PATTERN = re.compile(
+    r"\b(?:where|whose|only|except|excluding|filter\w*|greater|less|more than|fewer|above|below|between|"
+    r"per|each|group\w*|unique|distinct|round\w*|decimal|percent\w*|before|after|if)\b",
+    re.IGNORECASE
+)
+# Sentence ends; a dot only counts before whitespace, so "data.csv" doesn't split a sentence
+SENTENCE_END_PATTERN = re.compile(r"[.?!](?=\s|$)|\n")
+# Group 2: a quoted/bold/backticked token; group 3: a bare token (must look like a code)
+SECRET_PATTERN = re.compile(
+    r"\bsecret\s+(?:code|key|word|number)\s*(?:is\s*:?|:|=)\s*"
+    r"(?:(\*\*|[\"'`])([A-Za-z0-9_-]{3,64})\1|([A-Za-z0-9_-]{3,64})\b)",
+    re.IGNORECASE
+)
+NOT_A_SECRET = frozenset(
+    "the and that this your hidden shown given found located stored contained inside below above following "
+    "not also sum total value answer number result code secret same".split()
+)
+
+# Solvers in priority order; each is fn(text, workspace, files) -> (answer, confidence) or None
+SOLVERS = []
+
+
+def register_solver(fn):
+    """Add a fast-path solver. Solvers must be cheap and must never guess."""
+    SOLVERS.append(fn)
+    return fn
+
+
+def _to_json_number(value):
+    """numpy scalar -> plain int/float, as the submission JSON expects"""
+    value = value.item() if isinstance(value, np.generic) else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _looks_like_code(token: str, quoted: bool) -> bool:
+    """Quoted tokens, or bare ones with digits or inner capitals ("a7Xq", "XK-42"); never plain words"""
+    if token.lower() in NOT_A_SECRET:
+        return False
+    if quoted:
+        return True
+    has_digit = any(c.isdigit() for c in token)
+    mixed_case = any(c.isupper() for c in token[1:]) and any(c.islower() for c in token)
+    return has_digit or mixed_case
+
+
+@register_solver
+def secret_on_page(text: str, workspace: MissionWorkspace, files: list):
+    """Secret printed on the page itself ("The secret code is XYZ")"""
+    codes = set()
+    for m in SECRET_PATTERN.finditer(text):
+        token = m.group(2) or m.group(3)
+        if not _looks_like_code(token, quoted=m.group(2) is not None):
+            return None  # "The secret code is hidden in ..." describes a task, it isn't the code
+        codes.add(token)
+    if len(codes) != 1:
+        return None
+    return codes.pop(), 0.95
+
+
+@register_solver
+def column_aggregate(text: str, workspace: MissionWorkspace, files: list):
+    """Plain aggregate of one column ("the sum of the 'value' column") in the one table that has it"""
+    found = list(AGGREGATE_PATTERN.finditer(text))
+    if len({m.group(0).lower() for m in found}) != 1:
+        return None
+    match = found[0]
+    word, column = match.group(1).lower(), (match.group(2) or match.group(3)).strip()
+
+    # Qualifiers can come before the aggregate too ("For rows where ..., what is the sum of ...")
+    boundaries = [m.end() for m in SENTENCE_END_PATTERN.finditer(text, 0, match.start())]
+    sentence_start = boundaries[-1] if boundaries else max(0, match.start() - 200)
+    sentence_end = SENTENCE_END_PATTERN.search(text, match.end())
+    sentence = text[sentence_start:sentence_end.start() if sentence_end else match.end() + 200]
+    if QUALIFIER_PATTERN.search(sentence):
+        return None
+
+    tables = TableRegistry(workspace)
+    mentioned = [f for f in files if f in text]
+    candidates = [f for f in (mentioned or files) if f.lower().endswith(TABLE_EXTENSIONS)]
+    hits = []
+    for filename in candidates:
+        try:
+            df = tables.load(filename)
+        except Exception:
+            continue
+        names = {str(c).strip().lower(): c for c in df.columns}
+        if column.lower() in names:
+            hits.append(df[names[column.lower()]])
+    if len(hits) != 1:
+        return None  # Column missing or ambiguous across files: leave it to the LLM
+
+    series = hits[0]
+    how = AGGREGATIONS[word]
+    if how == "count":
+        return int(series.count()), 0.9
+    numbers = pd.to_numeric(series, errors="coerce")
+    if numbers.notna().sum() < series.notna().sum():
+        return None  # Non-numeric cells; the LLM can decide how to clean them
+    return _to_json_number(getattr(numbers, how)()), 0.95
+
+
+def solve_fast_path(page_data: dict, workspace: MissionWorkspace, page_url: str) -> dict:
+    """
+    Try every registered solver on the scraped page.
+
+    Returns {"solver", "answer", "confidence", "submit_url"} when exactly one
+    confident answer and a submit URL were found, else None (use the LLM).
+    Blocking; async callers should run it in a thread.
+    """
+    if not FASTPATH_ENABLED:
+        return None
+    text = page_data.get("text", "")
+    submit_url = find_submit_url(text, page_url)
+    if not submit_url:
+        return None
+
+    for solver in SOLVERS:
+        try:
+            result = solver(text, workspace, page_data.get("downloaded_files", []))
+        except Exception as e:
+            print(f"  ⚠️ Fast-path solver {solver.__name__} failed: {e}")
+            continue
+        if result and result[1] >= FASTPATH_MIN_CONFIDENCE:
+            answer, confidence = result
+            return {"solver": solver.__name__, "answer": answer, "confidence": confidence, "submit_url": submit_url}
+    return None
@@ -1,6 +1,8 @@
 import os
-import httpx
+import hashlib
 from dotenv import load_dotenv
+from app.http_client import http_client
+from app.kv_cache import SqliteCache, CACHE_DIR
 
 load_dotenv()
 AIPIPE_TOKEN = os.getenv("AIPIPE_TOKEN")
@@ -9,6 +11,23 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # Whisper API endpoints
 AIPIPE_WHISPER_URL = "https://aipipe.org/openrouter/v1/audio/transcriptions"
 OPENAI_WHISPER_URL = "https://api.openai.com/v1/audio/transcriptions"
+WHISPER_MODEL = "whisper-1"
+
+# Transcripts keyed by audio content hash + model, so retries and reruns skip Whisper
+transcription_cache = SqliteCache(
+    os.path.join(CACHE_DIR, "transcriptions.sqlite"),
+    ttl_seconds=float(os.getenv("TRANSCRIPTION_CACHE_TTL", str(30 * 24 * 3600))),
+    max_mb=float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "50"))
+)
+
+
+def _audio_cache_key(file_path: str) -> str:
+    """SHA-256 of the audio bytes (read in chunks) plus the model name"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return f"{WHISPER_MODEL}:{digest.hexdigest()}"
 
 
 async def transcribe_audio(file_path: str) -> str:
@@ -26,19 +45,20 @@ async def transcribe_audio(file_path: str) -> str:
     if not os.path.exists(file_path):
         return f"Error: Audio file not found: {file_path}"
     
+    cache_key = _audio_cache_key(file_path)
+    cached = transcription_cache.get(cache_key)
+    if cached is not None:
+        print(f"  ♻️ Cached transcript: {file_path}")
+        return cached
+
     print(f"  🎤 Transcribing: {file_path}")
     
-    # Read the audio file
-    with open(file_path, "rb") as f:
-        audio_data = f.read()
-    
-    filename = os.path.basename(file_path)
-    
     # Try AIPIPE Whisper endpoint first
     if AIPIPE_TOKEN:
         try:
-            result = await _transcribe_via_aipipe(audio_data, filename)
+            result = await _transcribe_via_aipipe(file_path)
             if result and not result.startswith("Error"):
+                transcription_cache.set(cache_key, result)
                 return result
         except Exception as e:
             print(f"  ⚠️ AIPIPE Whisper failed: {e}")
@@ -46,8 +66,9 @@ async def transcribe_audio(file_path: str) -> str:
     # Fallback to OpenAI direct
     if OPENAI_API_KEY:
         try:
-            result = await _transcribe_via_openai(audio_data, filename)
+            result = await _transcribe_via_openai(file_path)
             if result and not result.startswith("Error"):
+                transcription_cache.set(cache_key, result)
                 return result
         except Exception as e:
             print(f"  ⚠️ OpenAI Whisper failed: {e}")
@@ -55,53 +76,55 @@ async def transcribe_audio(file_path: str) -> str:
     return "Error: No working transcription API available"
 
 
-async def _transcribe_via_aipipe(audio_data: bytes, filename: str) -> str:
+async def _transcribe_via_aipipe(file_path: str) -> str:
     """Transcribe using AIPIPE's Whisper endpoint"""
     headers = {
         "Authorization": f"Bearer {AIPIPE_TOKEN}",
     }
     
-    files = {
-        "file": (filename, audio_data),
-        "model": (None, "whisper-1"),
-    }
-    
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            AIPIPE_WHISPER_URL,
-            headers=headers,
-            files=files,
-            timeout=120.0
-        )
-        
-        if resp.status_code == 200:
-            data = resp.json()
-            return data.get("text", "")
-        else:
-            return f"Error: AIPIPE returned {resp.status_code}"
+    # httpx streams an open file into the multipart body in small chunks
+    with open(file_path, "rb") as audio_file:
+        files = {
+            "file": (os.path.basename(file_path), audio_file),
+            "model": (None, WHISPER_MODEL),
+        }
+        async with http_client() as client:
+            resp = await client.post(
+                AIPIPE_WHISPER_URL,
+                headers=headers,
+                files=files,
+                timeout=120.0
+            )
+
+    if resp.status_code == 200:
+        data = resp.json()
+        return data.get("text", "")
+    else:
+        return f"Error: AIPIPE returned {resp.status_code}"
 
 
-async def _transcribe_via_openai(audio_data: bytes, filename: str) -> str:
+async def _transcribe_via_openai(file_path: str) -> str:
     """Transcribe using OpenAI's Whisper API directly"""
     headers = {
         "Authorization": f"Bearer {OPENAI_API_KEY}",
     }
     
-    files = {
-        "file": (filename, audio_data),
-        "model": (None, "whisper-1"),
-    }
-    
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            OPENAI_WHISPER_URL,
-            headers=headers,
-            files=files,
-            timeout=120.0
-        )
-        
-        if resp.status_code == 200:
-            data = resp.json()
-            return data.get("text", "")
-        else:
-            return f"Error: OpenAI returned {resp.status_code}"
\ No newline at end of file
+    # httpx streams an open file into the multipart body in small chunks
+    with open(file_path, "rb") as audio_file:
+        files = {
+            "file": (os.path.basename(file_path), audio_file),
+            "model": (None, WHISPER_MODEL),
+        }
+        async with http_client() as client:
+            resp = await client.post(
+                OPENAI_WHISPER_URL,
+                headers=headers,
+                files=files,
+                timeout=120.0
+            )
+
+    if resp.status_code == 200:
+        data = resp.json()
+        return data.get("text", "")
+    else:
+        return f"Error: OpenAI returned {resp.status_code}"
\ No newline at end of file
@@ -0,0 +1,68 @@
+import os
+import shutil
+import uuid
+
+WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT", "downloads")
+
+
+class MissionWorkspace:
+    """
+    Private download directory for a single mission.
+
+    Every mission gets `downloads/<mission_id>/` so concurrent missions in the
+    same process never see (or delete) each other's files. Use it as a context
+    manager to get scoped cleanup:
+
+        with MissionWorkspace() as workspace:
+            path = workspace.path("data.csv")
+    """
+
+    def __init__(self, mission_id: str = None, root: str = WORKSPACE_ROOT):
+        self.mission_id = mission_id or uuid.uuid4().hex[:12]
+        self.dir = os.path.join(root, self.mission_id)
+
+    def create(self) -> "MissionWorkspace":
+        os.makedirs(self.dir, exist_ok=True)
+        return self
+
+    def path(self, filename: str) -> str:
+        """Path for a new file in the workspace (directory parts are stripped)"""
+        return os.path.join(self.dir, os.path.basename(filename) or "downloaded_file")
+
+    def temp_path(self, filename: str) -> str:
+        """
+        Hidden scratch path to write a file before os.replace()-ing it to `path(filename)`.
+
+        Workspace files may be hard links to asset cache blobs, so they must
+        never be written in place.
+        """
+        return os.path.join(self.dir, f".{uuid.uuid4().hex[:8]}.{os.path.basename(filename) or 'downloaded_file'}.part")
+
+    def resolve(self, filepath: str) -> str:
+        """
+        Map a filename as written by generated code to a path in this workspace.
+
+        Accepts bare names ("data.csv"), legacy "downloads/data.csv" paths and
+        paths that already point inside the workspace.
+        """
+        if os.path.abspath(filepath).startswith(os.path.abspath(self.dir) + os.sep):
+            return filepath
+        nested = os.path.join(self.dir, filepath)
+        if os.path.exists(nested):
+            return nested
+        return self.path(filepath)
+
+    def list_files(self) -> list:
+        """Downloaded files, ignoring hidden bookkeeping entries"""
+        if not os.path.isdir(self.dir):
+            return []
+        return sorted(f for f in os.listdir(self.dir) if not f.startswith("."))
+
+    def cleanup(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def __enter__(self) -> "MissionWorkspace":
+        return self.create()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
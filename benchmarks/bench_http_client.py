@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call LLM request latency with a fresh client vs the shared pool.
+
+Starts a local mock of the chat completions endpoint and times N sequential
+`ask_llm` calls through the pooled keep-alive client against the same number
+of calls that open a new `httpx.AsyncClient()` each time (the old behaviour).
+
+The mock speaks plain HTTP/1.1, so the saving measured here is the TCP
+connect and pool setup only; against aipipe.org the TLS handshake is saved
+as well, which is usually the larger part.
+
+Usage:
+    python benchmarks/bench_http_client.py [calls]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import app.llm as llm
+from app.http_client import start_http_client, close_http_client
+
+COMPLETION = json.dumps({"choices": [{"message": {"content": "solution = 42"}}]}).encode()
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, *args):
+        pass
+
+
+async def legacy_call(url: str):
+    """What ask_llm used to do: a new client (and connection) per call"""
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(url, json={"model": "mock", "messages": []}, timeout=120.0)
+        return resp.json()
+
+
+def summarize(name: str, samples: list):
+    ms = [s * 1000 for s in samples]
+    print(f"{name:<22} mean {statistics.mean(ms):7.2f} ms | p50 {statistics.median(ms):7.2f} ms | "
+          f"p95 {sorted(ms)[int(len(ms) * 0.95) - 1]:7.2f} ms")
+
+
+async def main(calls: int):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+    llm.AIPIPE_URL = url
+    llm.AIPIPE_TOKEN = llm.AIPIPE_TOKEN or "bench-token"
+
+    fresh = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await legacy_call(url)
+        fresh.append(time.perf_counter() - start)
+
+    await start_http_client()
+    pooled = []
+    try:
+        for _ in range(calls):
+            start = time.perf_counter()
+            # Bypass the response cache: this measures pooled HTTP calls, not cache hits
+            await llm.ask_llm("ping", model="mock", use_cache=False)
+            pooled.append(time.perf_counter() - start)
+    finally:
+        await close_http_client()
+        server.shutdown()
+
+    print(f"{calls} sequential calls against {url}")
+    summarize("fresh client per call", fresh)
+    summarize("shared pooled client", pooled)
+    saved = (statistics.mean(fresh) - statistics.mean(pooled)) * 1000
+    print(f"Saved per call: {saved:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
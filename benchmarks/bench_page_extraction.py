@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass page extraction vs the old three-evaluate approach.
+
+Serves large synthetic quiz pages from a local HTTP server, loads each in
+headless Chromium and times `SmartScraper.get_page_context`'s extraction
+script against the previous links + cloned-body text + pre/code evaluates.
+Also reports the JS heap after each approach.
+
+Requires Playwright browsers (`python -m playwright install chromium`).
+
+Usage:
+    python benchmarks/bench_page_extraction.py [runs]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright
+from app.scraper import EXTRACT_PAGE_JS, EXTRACTION_LIMITS
+
+LEGACY_LINKS_JS = """() => Array.from(document.querySelectorAll('a[href]')).map(a => ({
+    text: (a.innerText || a.textContent || '').trim().substring(0, 100), href: a.href
+})).filter(l => l.href && !l.href.startsWith('javascript:'))"""
+
+LEGACY_TEXT_JS = """() => {
+    const clone = document.body.cloneNode(true);
+    clone.querySelectorAll('script, style, noscript').forEach(s => s.remove());
+    return clone.innerText || clone.textContent || '';
+}"""
+
+LEGACY_CODE_JS = """() => Array.from(document.querySelectorAll('pre, code'))
+    .map(b => b.textContent).join('\\n---\\n')"""
+
+FIXTURES = {
+    "small": dict(paragraphs=50, links=20, blocks=2, tables=1, rows=10),
+    "large": dict(paragraphs=5000, links=1000, blocks=200, tables=20, rows=200),
+    "huge": dict(paragraphs=30000, links=5000, blocks=1000, tables=50, rows=1000),
+}
+
+
+def build_page(paragraphs: int, links: int, blocks: int, tables: int, rows: int) -> str:
+    html = ["<html><head><style>p { margin: 0 }</style></head><body>", "<h1>Quiz</h1>"]
+    html += [f"<p>Paragraph {i} with some filler text about the dataset and the question.</p>" for i in range(paragraphs)]
+    html += [f'<a href="/file{i}.csv">file {i}</a>' for i in range(links)]
+    html += [f"<pre><code>print({i})\nsolution = {i}</code></pre>" for i in range(blocks)]
+    for t in range(tables):
+        html.append("<table>" + "".join(f"<tr><td>{t}</td><td>{r}</td><td>{r * t}</td></tr>" for r in range(rows)) + "</table>")
+    html.append('<form action="/submit" method="post"><input name="answer"><button>Go</button></form>')
+    html += [f"<script>var x{i} = {i};</script>" for i in range(50)]
+    html.append("</body></html>")
+    return "\n".join(html)
+
+
+async def heap_mb(page) -> float:
+    return await page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize / 1048576 : 0")
+
+
+async def time_it(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(runs: int):
+    with TemporaryDirectory() as root:
+        for name, spec in FIXTURES.items():
+            with open(os.path.join(root, f"{name}.html"), "w") as f:
+                f.write(build_page(**spec))
+
+        handler = partial(SimpleHTTPRequestHandler, directory=root)
+        handler.log_message = lambda *args: None
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=["--enable-precise-memory-info"])
+            page = await browser.new_page()
+            try:
+                for name in FIXTURES:
+                    await page.goto(f"http://127.0.0.1:{server.server_port}/{name}.html")
+
+                    async def legacy():
+                        await page.evaluate(LEGACY_LINKS_JS)
+                        await page.evaluate(LEGACY_TEXT_JS)
+                        await page.evaluate(LEGACY_CODE_JS)
+
+                    async def single_pass():
+                        await page.evaluate(EXTRACT_PAGE_JS, EXTRACTION_LIMITS)
+
+                    old = await time_it(legacy, runs)
+                    old_heap = await heap_mb(page)
+                    new = await time_it(single_pass, runs)
+                    new_heap = await heap_mb(page)
+
+                    print(f"{name:>6}: legacy p50 {statistics.median(old):8.2f} ms (heap {old_heap:6.1f} MB) | "
+                          f"single pass p50 {statistics.median(new):8.2f} ms (heap {new_heap:6.1f} MB) | "
+                          f"speedup {statistics.median(old) / statistics.median(new):5.1f}x")
+            finally:
+                await browser.close()
+                server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
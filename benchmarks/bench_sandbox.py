@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-run overhead of the sandbox pool vs in-process exec.
+
+Runs the same small pandas snippet N times through `execute_generated_code`
+(in the server process) and through `SandboxPool.run` (warm worker
+processes), and reports the added latency per run. Pool start-up is timed
+separately since it is paid once at server launch.
+
+Usage:
+    python benchmarks/bench_sandbox.py [runs]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.executor import execute_generated_code
+from app.sandbox import SandboxPool
+from app.workspace import MissionWorkspace
+
+CODE = """
+df = pd.DataFrame({'a': range(1000), 'b': range(1000)})
+solution = int((df['a'] * df['b']).sum())
+"""
+
+
+def summarize(name: str, samples: list):
+    ms = [s * 1000 for s in samples]
+    print(f"{name:<12} mean {statistics.mean(ms):7.2f} ms | p50 {statistics.median(ms):7.2f} ms | "
+          f"max {max(ms):7.2f} ms")
+
+
+async def main(runs: int):
+    with MissionWorkspace("bench") as workspace:
+        in_process = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            execute_generated_code(CODE, workspace)
+            in_process.append(time.perf_counter() - start)
+
+        pool = SandboxPool(size=1)
+        start = time.perf_counter()
+        await pool.start()
+        print(f"Pool warm-up (paid once): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        sandboxed = []
+        try:
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = await pool.run(CODE, workspace)
+                sandboxed.append(time.perf_counter() - start)
+                assert result["success"], result["error"]
+        finally:
+            await pool.stop()
+
+    print(f"{runs} sequential runs")
+    summarize("in-process", in_process)
+    summarize("sandbox", sandboxed)
+    overhead = (statistics.mean(sandboxed) - statistics.mean(in_process)) * 1000
+    print(f"Sandbox overhead per run: {overhead:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))